@@ -13,6 +13,7 @@ else:
 a = Analysis(
     ['CursorCreate/cursorcreate.py'],
     pathex = [str(spec_root)],
+    datas = [(str(spec_root / "CursorCreate" / "gui" / "icon.png"), "CursorCreate/gui")],
     hiddenimports = [],
     hookspath = [],
     runtime_hooks = [],
@@ -6,22 +6,26 @@ available...
 # TODO: Add progress bars to things...
 
 import sys
+from importlib.util import find_spec
 from pathlib import Path
 
-# We try to import lib for CursorCreate, if it fails we attempt to add our parent's parent to the path and try again.
-# This allows for execution via the command line.
-try:
-    from CursorCreate.lib import theme_util
-except ImportError as exp:
+# If CursorCreate isn't importable, we attempt to add our parent's parent to the path. This allows for execution via
+# the command line. Heavy imports (theme_util, the gui) are deferred to the commands that need them, so things like
+# '--help' don't have to load Pillow, NumPy, or Qt...
+if find_spec("CursorCreate") is None:
     sys.path.append(str(Path(__file__).resolve().parent.parent))
-    from CursorCreate.lib import theme_util
 
-# Attempt to import the gui, if it fails(gui packages missing) set the module to none to let methods below know...
-try:
-    from CursorCreate.gui.cursorthememaker import launch_gui
-except ImportError as exp:
-    print(repr(exp))
-    launch_gui = None
+
+def _get_launch_gui():
+    """
+    Attempt to import the gui's launch method, returning None if it fails(gui packages missing)...
+    """
+    try:
+        from CursorCreate.gui.cursorthememaker import launch_gui
+    except ImportError as exp:
+        print(repr(exp))
+        return None
+    return launch_gui
 
 
 def print_help():
@@ -48,30 +52,35 @@ def main():
     """
     args = sys.argv[1:]
 
+    # --help, print the help info before doing any heavy imports...
+    if (len(args) > 0) and (args[0] == "--help"):
+        print_help()
+        return
+
     if len(args) == 0:
         # No arguments, launch the gui if possible
+        launch_gui = _get_launch_gui()
         if launch_gui is not None:
             launch_gui(None)
         else:
-            print("Unable to import and run gui, check if PySide2 is installed...")
+            print("Unable to import and run gui, check if PySide6 is installed...")
             print_help()
         return
 
-    # --help, print the help info...
-    if args[0] == "--help":
-        print_help()
     # --open, grab next argument, and attempt to have gui open it...
-    elif args[0] == "--open":
-        if len(args) > 1:
-            if launch_gui is not None:
-                launch_gui(args[1])
-            else:
-                print("Unable to import and run gui, check if PySide2 is installed...")
+    if args[0] == "--open":
+        launch_gui = _get_launch_gui()
+        if launch_gui is None:
+            print("Unable to import and run gui, check if PySide6 is installed...")
+        elif len(args) > 1:
+            launch_gui(args[1])
         else:
             print("No file provided...")
             launch_gui(None)
     # --build, load in the project file and build the theme in place using utils api...
     elif args[0] == "--build":
+        from CursorCreate.lib import theme_util
+
         for config_file in args[1:]:
             try:
                 config_path = Path(config_file).resolve()
@@ -1,44 +1,88 @@
-import sys
+import importlib
+import importlib.util
 import os
+import sys
+from types import ModuleType
 from typing import Any
 
+
+def _configure_platform():
+    """
+    Set platform specific environment flags, must be run before Qt is loaded...
+    """
+    # Keep qt from freezing on MacOS...
+    if sys.platform.startswith("darwin"):
+        os.environ["QT_MAC_WANTS_LAYER"] = "1"
+
+
 # Change Qt Implementation here...
-if("PYTHON_QT_LIB" in os.environ):
+if "PYTHON_QT_LIB" in os.environ:
     val = os.environ["PYTHON_QT_LIB"]
+    _configure_platform()
     # We have to hard code imports for nuitka...
     # this forces nuitka to look for Qt and include it.
-    if(val == "PySide2"):
-        from PySide2 import QtCore, QtGui, QtWidgets, QtWebEngineWidgets, QtWebEngineCore
-    elif(val == "PyQt6"):
+    if val == "PySide2":
+        from PySide2 import (
+            QtCore,
+            QtGui,
+            QtWidgets,
+            QtWebEngineWidgets,
+            QtWebEngineCore,
+        )
+    elif val == "PyQt6":
         from PyQt6 import QtCore, QtGui, QtWidgets, QtWebEngineWidgets, QtWebEngineCore
-    elif(val == "PyQt5"):
+    elif val == "PyQt5":
         from PyQt5 import QtCore, QtGui, QtWidgets, QtWebEngineWidgets, QtWebEngineCore
     else:
-        from PySide6 import QtCore, QtGui, QtWidgets, QtWebEngineWidgets, QtWebEngineCore
+        from PySide6 import (
+            QtCore,
+            QtGui,
+            QtWidgets,
+            QtWebEngineWidgets,
+            QtWebEngineCore,
+        )
 else:
-    # Load the Qt Implementation dynamically in all other cases...
+    # Load the Qt Implementation dynamically in all other cases. The binding is only resolved on first attribute
+    # access, so importing this module is cheap...
     _QT_IMPLEMENTATIONS = ["PySide6", "PySide2", "PyQt6", "PyQt5"]
     _SELECTED_QT_IMPL = None
 
-    for impl_name in _QT_IMPLEMENTATIONS:
-        try:
-            _SELECTED_QT_IMPL = __import__(impl_name, globals(), locals(), [], 0)
-            break
-        except ImportError:
-            continue
+    def _resolve() -> ModuleType:
+        """
+        Find and import the first available Qt implementation, caching it for later calls...
+        """
+        global _SELECTED_QT_IMPL
 
-    if(_SELECTED_QT_IMPL is None):
-        raise ImportError("Unable to find a Python Qt library to use!")
+        if _SELECTED_QT_IMPL is not None:
+            return _SELECTED_QT_IMPL
 
-    __name__ = _SELECTED_QT_IMPL.__name__
+        _configure_platform()
 
-    def __dir__() -> list:
-        return dir(_SELECTED_QT_IMPL)
+        for impl_name in _QT_IMPLEMENTATIONS:
+            # Check if the binding is installed before importing it, so missing bindings are cheap to skip...
+            if importlib.util.find_spec(impl_name) is None:
+                continue
+            try:
+                _SELECTED_QT_IMPL = importlib.import_module(impl_name)
+                break
+            except ImportError:
+                continue
 
-    def __getattr__(name: str) -> Any:
-        return getattr(_SELECTED_QT_IMPL, name)
+        if _SELECTED_QT_IMPL is None:
+            raise ImportError("Unable to find a Python Qt library to use!")
 
+        return _SELECTED_QT_IMPL
 
-# Keep qt from freezing on MacOS...
-if(sys.platform.startswith("darwin")):
-    os.environ["QT_MAC_WANTS_LAYER"] = "1"
\ No newline at end of file
+    def __dir__() -> list:
+        return dir(_resolve())
+
+    def __getattr__(name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        # Submodules (QtCore, QtWidgets, ...) are imported directly, as they aren't loaded by the package import...
+        # A missing submodule raises its ImportError, rather than being hidden behind an AttributeError...
+        if name.startswith("Qt"):
+            module = importlib.import_module(f"{_resolve().__name__}.{name}")
+            globals()[name] = module
+            return module
+        return getattr(_resolve(), name)
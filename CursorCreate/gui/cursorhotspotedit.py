@@ -1,37 +1,60 @@
+from collections import OrderedDict
 from typing import Tuple
 
 import numpy as np
 from PIL import Image
-from PIL.ImageQt import toqpixmap
 
 from CursorCreate.gui.QtKit import QtCore, QtGui, QtWidgets
 
 from CursorCreate.gui.cursorpreviewdialog import CursorPreviewDialog
+from CursorCreate.gui.imageutil import pil_to_qpixmap
 from CursorCreate.gui.layouts import FlowLayout
 from CursorCreate.lib.cursor import AnimatedCursor, Cursor, CursorIcon
 
 Signal = getattr(QtCore, "Signal", getattr(QtCore, "pyqtSignal", None))
 
+
 class CursorHotspotWidget(QtWidgets.QWidget):
     VIEW_SIZE = (64, 64)
+    # Max number of frame pixmaps kept around for quickly switching frames...
+    PIXMAP_CACHE_SIZE = 32
+    # Blank image used when no cursor is given, shared as CursorIcons never modify their images...
+    _BLANK_IMAGE = None
+
+    # Pens and brushes for drawing the hotspot, these are plain value types so can be built without a QApplication...
+    _PEN_OUTLINE = QtGui.QPen(QtGui.QColor(0, 0, 0, 150))
+    _BRUSH_OUTLINE = QtGui.QBrush(QtGui.QColor(255, 0, 0, 100))
+    _PEN_CORE = QtGui.QPen(QtGui.QColor(0, 0, 255, 255))
+    _BRUSH_CORE = QtGui.QBrush(QtGui.QColor(0, 0, 255, 255))
 
     userHotspotChange = Signal((int, int))
 
     def __init__(
-        self, parent=None, cursor: AnimatedCursor = None, frame=0, *args, **kwargs
+        self,
+        parent=None,
+        cursor: AnimatedCursor = None,
+        frame=0,
+        normalize=True,
+        *args,
+        **kwargs,
     ):
         super().__init__(parent, *args, **kwargs)
         self._frame = 0
         self._frame_img = None
         self._pressed = False
+        self._last_hotspot = None
+        self._pixmap_cache = OrderedDict()
+        self._sizes = None
+        self._size_ratios = None
 
         if (cursor is None) or (len(cursor) == 0):
-            tmp_img = Image.fromarray(np.zeros(self.VIEW_SIZE + (4,), dtype=np.uint8))
-            tmp_cursor = Cursor([CursorIcon(tmp_img, 0, 0)])
+            tmp_cursor = Cursor([CursorIcon(self._get_blank_image(), 0, 0)])
             self._cursor = AnimatedCursor([tmp_cursor], [100])
         else:
             self._cursor = cursor
-            self._cursor.normalize([self.VIEW_SIZE])
+            # Callers sharing a cursor between many widgets can normalize it once themselves...
+            if normalize:
+                self._cursor.normalize([self.VIEW_SIZE])
 
         self.__painter = QtGui.QPainter()
         self.frame = frame
@@ -41,22 +64,27 @@ class CursorHotspotWidget(QtWidgets.QWidget):
         self.setSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
         self.resize(self.minimumSize())
 
+    @classmethod
+    def _get_blank_image(cls) -> Image.Image:
+        if cls._BLANK_IMAGE is None:
+            cls._BLANK_IMAGE = Image.fromarray(
+                np.zeros(cls.VIEW_SIZE + (4,), dtype=np.uint8)
+            )
+        return cls._BLANK_IMAGE
+
     def paintEvent(self, event: QtGui.QPaintEvent):
         self.__painter.begin(self)
 
-        self.__painter.setPen(QtGui.QColor("black"))
-        self.__painter.setBrush(QtGui.QColor("red"))
-
         self.__painter.drawPixmap(0, 0, self._frame_img)
 
         hotspot = QtCore.QPoint(*self.hotspot)
 
-        self.__painter.setPen(QtGui.QColor(0, 0, 0, 150))
-        self.__painter.setBrush(QtGui.QColor(255, 0, 0, 100))
+        self.__painter.setPen(self._PEN_OUTLINE)
+        self.__painter.setBrush(self._BRUSH_OUTLINE)
         self.__painter.drawEllipse(hotspot, 4, 4)
 
-        self.__painter.setPen(QtGui.QColor(0, 0, 255, 255))
-        self.__painter.setBrush(QtGui.QColor(0, 0, 255, 255))
+        self.__painter.setPen(self._PEN_CORE)
+        self.__painter.setBrush(self._BRUSH_CORE)
         self.__painter.drawEllipse(hotspot, 1, 1)
 
         self.__painter.end()
@@ -66,10 +94,16 @@ class CursorHotspotWidget(QtWidgets.QWidget):
 
     def mousePressEvent(self, event: QtGui.QMouseEvent):
         self._pressed = True
+        self._last_hotspot = None
 
     def mouseMoveEvent(self, event: QtGui.QMouseEvent):
         if self._pressed:
-            x, y = event.x(), event.y()
+            pos = event.pos()
+            x, y = pos.x(), pos.y()
+            # Skip rewriting the hotspot if the mouse hasn't moved to a new pixel...
+            if (x, y) == self._last_hotspot:
+                return
+            self._last_hotspot = (x, y)
             self.hotspot = x, y
             self.userHotspotChange.emit(x, y)
 
@@ -78,6 +112,22 @@ class CursorHotspotWidget(QtWidgets.QWidget):
             self.mouseMoveEvent(event)
             self._pressed = False
 
+    def _get_pixmap(self, image: Image.Image) -> QtGui.QPixmap:
+        # Images are keyed by id, we also keep the image itself to make sure the id wasn't reused...
+        key = id(image)
+        cached = self._pixmap_cache.get(key, None)
+
+        if (cached is not None) and (cached[0] is image):
+            self._pixmap_cache.move_to_end(key)
+            return cached[1]
+
+        pixmap = pil_to_qpixmap(image)
+        self._pixmap_cache[key] = (image, pixmap)
+        if len(self._pixmap_cache) > self.PIXMAP_CACHE_SIZE:
+            self._pixmap_cache.popitem(last=False)
+
+        return pixmap
+
     @property
     def frame(self) -> int:
         return self._frame
@@ -86,7 +136,8 @@ class CursorHotspotWidget(QtWidgets.QWidget):
     def frame(self, value: int):
         if 0 <= value < len(self._cursor):
             self._frame = value
-            self._frame_img = toqpixmap(
+            self._update_size_ratios()
+            self._frame_img = self._get_pixmap(
                 self._cursor[self._frame][0][self.VIEW_SIZE].image
             )
             self.update()
@@ -108,14 +159,23 @@ class CursorHotspotWidget(QtWidgets.QWidget):
             max(0, value[1]), self.VIEW_SIZE[1] - 1
         )
 
-        for size in self._cursor[self._frame][0]:
-            x_rat, y_rat = size[0] / self.VIEW_SIZE[0], size[1] / self.VIEW_SIZE[1]
-            x_hot, y_hot = int(value[0] * x_rat), int(value[1] * y_rat)
+        sub_cursor = self._cursor[self._frame][0]
+
+        # Rebuild the size ratios if sizes were added to or removed from the frame since they were computed...
+        if (self._sizes is None) or (len(self._sizes) != len(sub_cursor)):
+            self._update_size_ratios()
 
-            self._cursor[self._frame][0][size].hotspot = x_hot, y_hot
+        hotspots = (np.asarray(value) * self._size_ratios).astype(np.int64)
+
+        for size, (x_hot, y_hot) in zip(self._sizes, hotspots.tolist()):
+            sub_cursor[size].hotspot = x_hot, y_hot
 
         self.update()
 
+    def _update_size_ratios(self):
+        self._sizes = list(self._cursor[self._frame][0])
+        self._size_ratios = np.array(self._sizes, dtype=np.float64) / self.VIEW_SIZE
+
     @property
     def current_cursor(self) -> AnimatedCursor:
         return self._cursor
@@ -126,12 +186,20 @@ class CursorEditWidget(QtWidgets.QFrame):
     userHotspotChange = Signal((int, int))
 
     def __init__(
-        self, parent=None, cursor: AnimatedCursor = None, frame=0, *args, **kwargs
+        self,
+        parent=None,
+        cursor: AnimatedCursor = None,
+        frame=0,
+        normalize=True,
+        *args,
+        **kwargs,
     ):
         super().__init__(parent, *args, **kwargs)
 
         self._main_layout = QtWidgets.QVBoxLayout(self)
-        self._hotspot_picker = CursorHotspotWidget(cursor=cursor, frame=frame)
+        self._hotspot_picker = CursorHotspotWidget(
+            cursor=cursor, frame=frame, normalize=normalize
+        )
         self._delay_adjuster = QtWidgets.QSpinBox()
         self._delay_adjuster.setRange(0, 0xFFFF)
         self._delay_adjuster.setSingleStep(1)
@@ -199,7 +267,11 @@ class CursorEditWidget(QtWidgets.QFrame):
         if not (0 <= value < 0xFFFF and isinstance(value, int)):
             return
 
+        # Block signals so programmatic changes aren't reported as user changes, which would cause
+        # shared delays to recursively update each other...
+        self._delay_adjuster.blockSignals(True)
         self._delay_adjuster.setValue(value)
+        self._delay_adjuster.blockSignals(False)
         self.current_cursor[self.frame] = (self.current_cursor[self.frame][0], value)
 
 
@@ -224,8 +296,11 @@ class HotspotEditDialog(QtWidgets.QDialog):
             self._hotspot_picker_lst = [CursorEditWidget()]
             self._cursor = self._hotspot_picker_lst[0].current_cursor
         else:
+            # Normalize once here rather than in every frame's widget...
+            cursor.normalize([CursorHotspotWidget.VIEW_SIZE])
             self._hotspot_picker_lst = [
-                CursorEditWidget(None, cursor, i) for i in range(len(cursor))
+                CursorEditWidget(None, cursor, i, normalize=False)
+                for i in range(len(cursor))
             ]
             self._cursor = cursor
 
@@ -275,12 +350,15 @@ class HotspotEditDialog(QtWidgets.QDialog):
     def _on_hotspot_changed(self, x: int, y: int):
         if self._share_hotspots.isChecked():
             for cur_picker in self._hotspot_picker_lst:
-                cur_picker.hotspot = x, y
+                # Skip pickers already at this hotspot, avoiding rescaling and repainting them...
+                if cur_picker.hotspot != (x, y):
+                    cur_picker.hotspot = x, y
 
     def _on_delay_changed(self, value: int):
         if self._share_delays.isChecked():
             for cur_picker in self._hotspot_picker_lst:
-                cur_picker.delay = value
+                if cur_picker.delay != value:
+                    cur_picker.delay = value
 
     def _on_preview(self):
         dialog = CursorPreviewDialog(self, self.current_cursor)
@@ -1,6 +1,6 @@
-from PIL.ImageQt import toqpixmap
 from CursorCreate.gui.QtKit import QtCore, QtGui, QtWidgets
 from CursorCreate.gui.cursorviewer import CursorDisplayWidget
+from CursorCreate.gui.imageutil import pil_to_qpixmap
 from CursorCreate.lib import cursor_util
 from CursorCreate.lib.cursor import AnimatedCursor
 
@@ -22,29 +22,40 @@ class CursorPreviewDialog(QtWidgets.QDialog):
         self._frame.setLayout(self._box)
         self._box.setContentsMargins(0, 0, 0, 0)
 
-        self._viewers = []
+        # Viewers are built when the dialog is first shown, we only create the rows to place them in here...
+        self._cursor = cursor
+        self._viewers = None
+        self._viewer_rows = []
 
         for color in self._colors:
             widget = QtWidgets.QWidget()
             widget.setStyleSheet(f"background-color: {color};")
             hbox = QtWidgets.QHBoxLayout()
-
-            for size in cursor_util.DEFAULT_SIZES:
-                c_view = CursorDisplayWidget(cursor=cursor, size=size[0])
-                self._viewers.append(c_view)
-                hbox.addWidget(c_view)
-
             widget.setLayout(hbox)
+            self._viewer_rows.append(hbox)
             self._main_layout.addWidget(widget)
 
         self._main_layout.addWidget(self._frame)
 
         self.setLayout(self._main_layout)
-        self.setMinimumSize(self.sizeHint())
 
         # Set to delete this dialog on close...
         self.setAttribute(QtCore.Qt.WA_DeleteOnClose, True)
 
+    def showEvent(self, evt: QtGui.QShowEvent):
+        if self._viewers is None:
+            self._viewers = []
+
+            for hbox in self._viewer_rows:
+                for size in cursor_util.DEFAULT_SIZES:
+                    c_view = CursorDisplayWidget(cursor=self._cursor, size=size[0])
+                    self._viewers.append(c_view)
+                    hbox.addWidget(c_view)
+
+            self.setMinimumSize(self.sizeHint())
+
+        super().showEvent(evt)
+
     def closeEvent(self, evt: QtGui.QCloseEvent):
         super().closeEvent(evt)
         self.accept()
@@ -53,19 +64,33 @@ class CursorPreviewDialog(QtWidgets.QDialog):
 class PreviewArea(QtWidgets.QWidget):
     CURSOR_SIZE = (32, 32)
 
+    # Brush and radius of each ring of the hotspot marker, drawn from the outside in...
+    _HOTSPOT_PEN = QtGui.QPen(QtGui.QColor(0, 0, 0, 0))
+    _HOTSPOT_RINGS = [
+        (QtGui.QBrush(QtGui.QColor(0, 0, 255, 100)), 20),
+        (QtGui.QBrush(QtGui.QColor(0, 255, 0, 200)), 8),
+        (QtGui.QBrush(QtGui.QColor(255, 0, 0, 255)), 3),
+    ]
+
     def __init__(self, parent, cursor: AnimatedCursor):
         super().__init__(parent)
         self._core_painter = QtGui.QPainter()
-        self._pixmaps = [
-            toqpixmap(sub_cur[self.CURSOR_SIZE].image)
-            for sub_cur, delay in cursor
-        ]
-        self._hotspots = [
-            sub_cur[self.CURSOR_SIZE].hotspot for sub_cur, delay in cursor
-        ]
-        self._delays = [delay for sub_cur, delay in cursor]
-
-        self._animation_timer = QtCore.QTimer()
+
+        cursor_size = self.CURSOR_SIZE
+        pixmaps, hotspots, delays = [], [], []
+
+        for sub_cur, delay in cursor:
+            icon = sub_cur[cursor_size]
+            pixmaps.append(pil_to_qpixmap(icon.image))
+            hotspots.append(icon.hotspot)
+            delays.append(delay)
+
+        self._pixmaps = pixmaps
+        self._hotspots = tuple(hotspots)
+        self._delays = tuple(delays)
+
+        # Parented to this widget so Qt destroys it along with the widget...
+        self._animation_timer = QtCore.QTimer(self)
         self._animation_timer.setSingleShot(True)
         self._animation_timer.timeout.connect(self.moveStep)
         self._current_frame = -1
@@ -80,8 +105,6 @@ class PreviewArea(QtWidgets.QWidget):
         self._hotspot_preview_loc = None
         self._pressed = False
 
-        self.moveStep()
-
     def moveStep(self):
         self._current_frame = (self._current_frame + 1) % len(self._delays)
         if len(self._pixmaps) > 0:
@@ -95,35 +118,43 @@ class PreviewArea(QtWidgets.QWidget):
             self._animation_timer.setInterval(self._delays[self._current_frame])
             self._animation_timer.start()
 
+    def showEvent(self, event: QtGui.QShowEvent):
+        super().showEvent(event)
+        # Start the animation only once the widget is actually visible, or resume it on the frame it was hidden on...
+        if self._current_frame == -1:
+            self.moveStep()
+        elif len(self._pixmaps) > 1:
+            self._animation_timer.start()
+
+    def hideEvent(self, event: QtGui.QHideEvent):
+        self._animation_timer.stop()
+        super().hideEvent(event)
+
     def paintEvent(self, event: QtGui.QPaintEvent):
         self._core_painter.begin(self)
 
         if self._hotspot_preview_loc is not None:
-            self._core_painter.setPen(QtGui.QColor(0, 0, 0, 0))
-            colors = [(0, 0, 255, 100), (0, 255, 0, 200), (255, 0, 0, 255)]
-            widths = [20, 8, 3]
-            for color, width in zip(colors, widths):
-                self._core_painter.setBrush(QtGui.QBrush(QtGui.QColor(*color)))
-                self._core_painter.drawEllipse(
-                    QtCore.QPoint(*self._hotspot_preview_loc), width, width
-                )
+            self._core_painter.setPen(self._HOTSPOT_PEN)
+            center = QtCore.QPoint(*self._hotspot_preview_loc)
+            for brush, width in self._HOTSPOT_RINGS:
+                self._core_painter.setBrush(brush)
+                self._core_painter.drawEllipse(center, width, width)
 
         self._core_painter.end()
 
     def mousePressEvent(self, event: QtGui.QMouseEvent):
         self._pressed = True
-        self._hotspot_preview_loc = (event.x(), event.y())
+        pos = event.pos()
+        self._hotspot_preview_loc = (pos.x(), pos.y())
         self.update()
 
     def mouseMoveEvent(self, event: QtGui.QMouseEvent):
         if self._pressed:
-            self._hotspot_preview_loc = (event.x(), event.y())
+            pos = event.pos()
+            self._hotspot_preview_loc = (pos.x(), pos.y())
             self.update()
 
     def mouseReleaseEvent(self, event: QtGui.QMouseEvent):
         if self._pressed:
             self.mouseMoveEvent(event)
             self._pressed = False
-
-    def __del__(self):
-        del self._animation_timer
@@ -1,6 +1,6 @@
 import pathlib
+import shutil
 from io import BytesIO
-from urllib.error import URLError
 from urllib.request import urlopen
 
 from CursorCreate.gui.QtKit import QtCore, QtGui, QtWidgets
@@ -11,6 +11,11 @@ from CursorCreate.lib.cursor_util import load_cursor
 
 class CursorSelectWidget(QtWidgets.QFrame):
     FILE_DIALOG_TYPES = "Image, Cursor, or SVG (*)"
+    # Timeout in seconds and read size in bytes for cursors dropped from the internet...
+    URL_TIMEOUT = 5
+    URL_CHUNK_SIZE = 64 * 1024
+    # Url schemes which we will attempt to download cursors from...
+    URL_SCHEMES = {"http", "https", "ftp"}
 
     def __init__(
         self, parent=None, label_text="Label", def_cursor=None, *args, **kwargs
@@ -75,6 +80,7 @@ class CursorSelectWidget(QtWidgets.QFrame):
             cursor = None
             working_path = None
 
+            # Use the first url which loads as a cursor...
             for cur_path in event.mimeData().urls():
                 if cur_path.isLocalFile():
                     path = cur_path.path(options=QtCore.QUrl.FullyDecoded)
@@ -84,20 +90,23 @@ class CursorSelectWidget(QtWidgets.QFrame):
                     ) and path.startswith("/"):
                         path = path[1:]
 
-                    with open(path, "rb") as f:
-                        try:
+                    try:
+                        with open(path, "rb") as f:
                             cursor = load_cursor(f)
-                            working_path = path
-                        except ValueError as e:
-                            print(e)
-                else:
+                        working_path = path
+                        break
+                    except (OSError, ValueError) as e:
+                        print(e)
+                elif cur_path.scheme().lower() in self.URL_SCHEMES:
                     try:
-                        req = urlopen(cur_path.url())
-                        data = BytesIO(req.read())
+                        data = BytesIO()
+                        with urlopen(cur_path.url(), timeout=self.URL_TIMEOUT) as req:
+                            shutil.copyfileobj(req, data, self.URL_CHUNK_SIZE)
                         data.seek(0)
                         cursor = load_cursor(data)
                         working_path = None
-                    except (URLError, ValueError) as e:
+                        break
+                    except (OSError, ValueError) as e:
                         print(e)
 
             if cursor is not None:
@@ -107,15 +116,17 @@ class CursorSelectWidget(QtWidgets.QFrame):
                 return
 
         if event.mimeData().hasImage():
-            mem_img = BytesIO()
             buffer = QtCore.QBuffer()
+            buffer.open(QtCore.QIODevice.WriteOnly)
             image = QtGui.QImage(event.mimeData().imageData())
             image.save(buffer, "PNG")
+            buffer.close()
 
-            mem_img.write(buffer)
-            mem_img.seek(0)
-
-            self.current_cursor = load_cursor(mem_img)
+            try:
+                self.current_cursor = load_cursor(BytesIO(bytes(buffer.data())))
+            except ValueError as e:
+                print(e)
+                return
             self._current_file = None
             event.acceptProposedAction()
             return
@@ -17,5 +17,5 @@ class CursorViewEditWidget(CursorDisplayWidget):
             if self.current_cursor is not None:
                 mod_hotspot = HotspotEditDialog(self.window(), self.current_cursor)
                 mod_hotspot.exec_()
-                self.current_cursor = self.current_cursor
+                self.refresh()
                 del mod_hotspot
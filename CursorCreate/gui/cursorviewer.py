@@ -1,11 +1,18 @@
-from PIL.ImageQt import toqpixmap
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Tuple
+
+from PIL import Image
 from CursorCreate.gui.QtKit import QtCore, QtGui, QtWidgets
+from CursorCreate.gui.imageutil import pil_to_qpixmap
 
 from CursorCreate.lib.cursor import AnimatedCursor
 
 
 class CursorDisplayWidget(QtWidgets.QWidget):
     DEF_SIZE = 64
+    # Transparent pixmaps shown when there is no cursor, by size. Pixmaps are implicitly shared so can be reused...
+    _BLANK_CACHE = {}
 
     def __init__(
         self, parent=None, cursor: AnimatedCursor = None, size=None, *args, **kwargs
@@ -15,12 +22,17 @@ class CursorDisplayWidget(QtWidgets.QWidget):
         self._cur = None
         self._current_frame = None
         self._is_ani = None
-        self.__painter = QtGui.QPainter()
-        self.__animation_timer = QtCore.QTimer()
+        # Parented to this widget so Qt destroys it along with the widget...
+        self.__animation_timer = QtCore.QTimer(self)
         self.__animation_timer.setSingleShot(True)
         self.__animation_timer.timeout.connect(self.move_step)
+        # Measures time since the animation started, frames are picked from it so timer delays don't add up...
+        self.__animation_clock = QtCore.QElapsedTimer()
         self._imgs = None
         self._delays = None
+        self._end_times = None
+        # Frame images and pixmaps of the displayed cursor, by id of the cursor...
+        self._pixmap_cache = {}
         self._pressed = False
         self._size = self.DEF_SIZE if (size is None) else int(size)
 
@@ -29,21 +41,72 @@ class CursorDisplayWidget(QtWidgets.QWidget):
         self.setMinimumSize(self._imgs[self._current_frame].size())
         self.setSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
         self.resize(self._imgs[self._current_frame].size())
+        # Contents only change when the frame changes, so resizes don't require a full repaint. Frames can be
+        # transparent, so we still need the background painted under them...
+        self.setAttribute(QtCore.Qt.WA_StaticContents, True)
+
+    @classmethod
+    def _get_blank(cls, size: int) -> QtGui.QPixmap:
+        blank = cls._BLANK_CACHE.get(size, None)
+
+        if blank is None:
+            blank = QtGui.QPixmap(size, size)
+            blank.fill(QtCore.Qt.transparent)
+            cls._BLANK_CACHE[size] = blank
+
+        return blank
+
+    def _get_pixmaps(
+        self, cursor: AnimatedCursor, images: Tuple[Image.Image, ...]
+    ) -> Tuple[QtGui.QPixmap, ...]:
+        """
+        PRIVATE METHOD:
+        Get the pixmaps for every frame of the cursor, given the images of the frames at this widget's size. Pixmaps
+        are cached by cursor, and are reused as long as the frames still hold the same images (CursorIcon images are
+        never modified).
+        """
+        cached = self._pixmap_cache.get(id(cursor), None)
+        if (
+            (cached is not None)
+            and (len(cached[0]) == len(images))
+            and all(a is b for a, b in zip(cached[0], images))
+        ):
+            return cached[1]
+
+        pixmaps = tuple(pil_to_qpixmap(image) for image in images)
+        # Only the pixmaps of the cursor being displayed are kept, the cached images keep the identity check valid...
+        self._pixmap_cache = {id(cursor): (images, pixmaps)}
+        return pixmaps
 
     def paintEvent(self, event: QtGui.QPaintEvent):
-        self.__painter.begin(self)
-        self.__painter.drawPixmap(0, 0, self._imgs[self._current_frame])
-        self.__painter.end()
+        painter = QtGui.QPainter(self)
+        painter.drawPixmap(0, 0, self._imgs[self._current_frame])
+        painter.end()
 
     def sizeHint(self) -> QtCore.QSize:
         return QtCore.QSize(self.DEF_SIZE, self.DEF_SIZE)
 
     def move_step(self):
-        self._current_frame = (self._current_frame + 1) % len(self._imgs)
-        self.update()
-        if self._is_ani:
-            self.__animation_timer.setInterval(self._delays[self._current_frame])
-            self.__animation_timer.start()
+        if not self._is_ani:
+            return
+
+        # Find the frame being shown at this point in the animation loop...
+        time_in = self.__animation_clock.elapsed() % self._end_times[-1]
+        frame = bisect_right(self._end_times, time_in)
+
+        if frame != self._current_frame:
+            self._current_frame = frame
+            self.update()
+
+        # Wake up exactly when this frame ends...
+        self.__animation_timer.setInterval(self._end_times[frame] - time_in)
+        self.__animation_timer.start()
+
+    def _set_delays(self, delays: Tuple[int, ...]):
+        self._delays = delays
+        # The time each frame ends at, measured from the start of the animation loop...
+        self._end_times = tuple(accumulate(delays))
+        self._is_ani = (len(delays) > 1) and (self._end_times[-1] > 0)
 
     @property
     def current_cursor(self) -> AnimatedCursor:
@@ -52,35 +115,44 @@ class CursorDisplayWidget(QtWidgets.QWidget):
     @current_cursor.setter
     def current_cursor(self, cursor: AnimatedCursor):
         self._cur = cursor
-        self._current_frame = -1
-        self._is_ani = False
+        self._current_frame = 0
         self.__animation_timer.stop()
 
         if cursor is not None and (len(cursor) > 0):
-            self._cur.normalize([(self._size, self._size)])
-            self._imgs = [
-                toqpixmap(cur[(self._size, self._size)].image)
-                for cur, delay in cursor
-            ]
-            self._delays = [delay for cur, delay in cursor]
-
-            if len(cursor) > 1:
-                self._is_ani = True
+            size = (self._size, self._size)
+            self._cur.normalize([size])
+            # Grab the images and delays in a single pass, unzipping them into tuples...
+            images, delays = zip(*((cur[size].image, delay) for cur, delay in cursor))
+            self._imgs = self._get_pixmaps(cursor, images)
+            self._set_delays(delays)
         else:
-            self._imgs = [
-                QtGui.QPixmap(
-                    QtGui.QImage(
-                        bytes(4 * self._size**2),
-                        self._size,
-                        self._size,
-                        4,
-                        QtGui.QImage.Format_ARGB32,
-                    )
-                )
-            ]
-            self._delays = [0]
-
-        self.move_step()
+            self._imgs = (self._get_blank(self._size),)
+            self._set_delays((0,))
+
+        self.update()
+        # Static cursors just display the first frame, so only animated ones need the timer...
+        if self._is_ani:
+            self.__animation_clock.start()
+            self.__animation_timer.setInterval(self._end_times[0])
+            self.__animation_timer.start()
+
+    def refresh(self):
+        """
+        Refresh this viewer after its cursor was modified in place (hotspots or delays changed). Frame images are
+        never modified in place, so only the delays need to be reloaded. The pixmap cache is still dropped, so the
+        next time a cursor is set its frames are converted again.
+        """
+        self._pixmap_cache.clear()
+        if (self._cur is not None) and (len(self._cur) > 0):
+            was_ani = self._is_ani
+            self._set_delays(tuple(delay for cur, delay in self._cur))
+
+            if not self._is_ani:
+                self.__animation_timer.stop()
+            elif not was_ani:
+                self.__animation_clock.start()
+                self.move_step()
+        self.update()
 
     def stop_and_destroy(self):
         """Forcefully destroys the cursor viewers animation timer by stopping it and deleting it."""
@@ -89,6 +161,3 @@ class CursorDisplayWidget(QtWidgets.QWidget):
 
         del self.__animation_timer
         self.__animation_timer = None
-
-    def __del__(self):
-        self.stop_and_destroy()
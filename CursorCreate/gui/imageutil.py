@@ -0,0 +1,27 @@
+"""
+Utilities for converting PIL images into Qt image types without going through PIL's ImageQt module...
+"""
+
+from PIL import Image
+
+from CursorCreate.gui.QtKit import QtGui
+
+
+def pil_to_qpixmap(image: Image.Image) -> QtGui.QPixmap:
+    """
+    Convert a PIL image into a QPixmap. The image's pixels are dumped once as RGBA, which is the byte order of Qt's
+    RGBA8888 format on any host, and the QImage used for the conversion views that buffer directly.
+
+    :param image: The PIL Image to convert.
+    :return: A QPixmap with the same contents as the image.
+    """
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+
+    width, height = image.size
+    # PIL images don't expose their pixel memory, so this single dump is the minimum number of copies (wrapping the
+    # image in a numpy array calls tobytes internally as well). The buffer must stay alive until the pixmap is built,
+    # as the QImage doesn't own it...
+    data = image.tobytes("raw", "RGBA")
+    q_image = QtGui.QImage(data, width, height, width * 4, QtGui.QImage.Format_RGBA8888)
+    return QtGui.QPixmap.fromImage(q_image)
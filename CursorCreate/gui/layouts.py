@@ -27,6 +27,14 @@ class FlowLayout(QtWidgets.QLayout):
     def addItem(self, item):
         self.itemList.append(item)
 
+    def add_widgets(self, widgets):
+        # Add all the widgets and only invalidate the layout once, rather then once per widget like addWidget...
+        for widget in widgets:
+            self.addChildWidget(widget)
+            self.itemList.append(QtWidgets.QWidgetItem(widget))
+
+        self.invalidate()
+
     def count(self):
         return len(self.itemList)
 
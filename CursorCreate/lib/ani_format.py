@@ -1,11 +1,25 @@
+import struct
+import sys
+from array import array
+from collections import Counter
 from io import BytesIO
 from typing import Any, BinaryIO, Dict, Iterator, Set, Tuple
 
+import numpy as np
 from PIL import BmpImagePlugin
 
 from CursorCreate.lib.cur_format import CurFormat
 from CursorCreate.lib.cursor import AnimatedCursor, Cursor, CursorIcon
-from CursorCreate.lib.format_core import AnimatedCursorStorageFormat, to_bytes, to_int
+from CursorCreate.lib.format_core import AnimatedCursorStorageFormat
+
+# Unsigned 32 bit integers in either byteorder, used for RIFF chunk sizes...
+_UINT32 = {"little": struct.Struct("<I"), "big": struct.Struct(">I")}
+_pack_u4 = _UINT32["little"].pack
+# The identifier and size which start every RIFF chunk...
+_CHUNK_HEADER = struct.Struct("<4sI")
+# The fields of the "anih" chunk, following the header size: frames, steps, width, height, bits per pixel, planes,
+# display rate, and flags...
+_ANI_HEADER = struct.Struct("<8I")
 
 
 # UTILITY METHODS:
@@ -31,6 +45,8 @@ def read_chunks(
     if list_chunks is None:
         list_chunks = set()
 
+    unpack_size = _UINT32[byteorder].unpack
+
     while True:
         next_id = buffer.read(4)
         if next_id == b"":
@@ -38,17 +54,17 @@ def read_chunks(
         if next_id in skip_chunks:
             continue
 
-        size = to_int(buffer.read(4), byteorder=byteorder)
+        size_data = buffer.read(4)
+        if len(size_data) < 4:
+            return
+
+        (size,) = unpack_size(size_data)
 
         if next_id in list_chunks:
-            # print(f"(entering {next_id} chunk) -> [")
-            yield from read_chunks(
-                BytesIO(buffer.read(size)), skip_chunks, list_chunks, byteorder
-            )
-            # print(f"](exiting {next_id} chunk)")
+            # The sub-chunks of a list chunk follow its header directly, so we just keep reading them from the same
+            # buffer rather than copying the list's data out and recursing into it...
             continue
 
-        # print(f"emit chunk {next_id} of size {size}")
         yield next_id, size, buffer.read(size)
 
 
@@ -64,7 +80,7 @@ def write_chunk(
     :param byteorder: The byteorder to use when writing the byte's size, defaults to "little"
     """
     buffer.write(chunk_id[:4])
-    buffer.write(to_bytes(len(chunk_data), 4, byteorder=byteorder))
+    buffer.write(_UINT32[byteorder].pack(len(chunk_data)))
     buffer.write(chunk_data)
 
 
@@ -75,23 +91,40 @@ def _header_chunk(header: None, data: bytes, data_out: Dict[str, Any]):
     if header is not None:
         raise SyntaxError("This ani has 2 headers!")
 
-    if len(data) == 36:
-        data = data[4:]
+    offset = 4 if (len(data) == 36) else 0
+
+    if len(data) - offset < _ANI_HEADER.size:
+        raise SyntaxError("Header chunk is too small!")
+
+    (
+        num_frames,
+        num_steps,
+        width,
+        height,
+        bit_count,
+        num_planes,
+        display_rate,
+        flags,
+    ) = _ANI_HEADER.unpack_from(data, offset)
 
     h_data = {
-        "num_frames": to_int(data[0:4]),
-        "num_steps": to_int(data[4:8]),
-        "width": to_int(data[8:12]),
-        "height": to_int(data[12:16]),
-        "bit_count": to_int(data[16:20]),
+        "num_frames": num_frames,
+        "num_steps": num_steps,
+        "width": width,
+        "height": height,
+        "bit_count": bit_count,
         "num_planes": 1,
-        "display_rate": to_int(data[24:28]),
-        "contains_seq": bool((to_int(data[28:32]) >> 1) & 1),
-        "is_in_ico": bool(to_int(data[28:32]) & 1),
+        "display_rate": display_rate,
+        "contains_seq": bool((flags >> 1) & 1),
+        "is_in_ico": bool(flags & 1),
     }
 
+    if num_steps > 0 and num_frames == 0:
+        raise SyntaxError("This ani has steps but no frames!")
+
     data_out["header"] = h_data
-    data_out["seq"] = [i % h_data["num_frames"] for i in range(h_data["num_steps"])]
+    # By default every step just plays the next frame, looping back around to the start...
+    data_out["seq"] = (np.arange(num_steps) % max(num_frames, 1)).tolist()
     data_out["rate"] = [h_data["display_rate"]] * h_data["num_steps"]
 
 
@@ -120,6 +153,17 @@ def _icon_chunk(header: Dict[str, Any], data: bytes, data_out: Dict[str, Any]):
     data_out["list"].append(cursor)
 
 
+def _to_uint32_array(data: bytes) -> array:
+    """
+    Decode little endian unsigned 32 bit integers, as stored in the "seq " and "rate" chunks, into a compact array.
+    """
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
 def _seq_chunk(header: Dict[str, Any], data: bytes, data_out: Dict[str, Any]):
     """
     Represents .ani's sequence chunk, which has an identifier of "seq ".
@@ -127,12 +171,12 @@ def _seq_chunk(header: Dict[str, Any], data: bytes, data_out: Dict[str, Any]):
     if header is None:
         raise SyntaxError("seq chunk came before header!")
 
-    if (len(data) // 4) != header["num_steps"]:
+    if len(data) != header["num_steps"] * 4:
         raise SyntaxError(
             "Length of sequence chunk does not match the number of steps!"
         )
 
-    data_out["seq"] = [to_int(data[i : i + 4]) for i in range(0, len(data), 4)]
+    data_out["seq"] = _to_uint32_array(data)
 
 
 def _rate_chunk(header: Dict[str, Any], data: bytes, data_out: Dict[str, Any]):
@@ -142,10 +186,10 @@ def _rate_chunk(header: Dict[str, Any], data: bytes, data_out: Dict[str, Any]):
     if header is None:
         raise SyntaxError("rate chunk became before header!")
 
-    if (len(data) // 4) != header["num_steps"]:
+    if len(data) != header["num_steps"] * 4:
         raise SyntaxError("Length of rate chunk does not match the number of steps!")
 
-    data_out["rate"] = [to_int(data[i : i + 4]) for i in range(0, len(data), 4)]
+    data_out["rate"] = _to_uint32_array(data)
 
 
 class AniFormat(AnimatedCursorStorageFormat):
@@ -180,6 +224,11 @@ class AniFormat(AnimatedCursorStorageFormat):
             first_bytes[8:12] == cls.ACON_MAGIC
         )
 
+    @classmethod
+    def get_magic_prefixes(cls) -> Tuple[bytes, ...]:
+        # Other RIFF files share this prefix, check still compares the "ACON" form type...
+        return (cls.RIFF_MAGIC,)
+
     @classmethod
     def read(cls, cur_file: BinaryIO) -> AnimatedCursor:
         """
@@ -201,11 +250,14 @@ class AniFormat(AnimatedCursorStorageFormat):
             if chunk_id in cls.CHUNKS:
                 cls.CHUNKS[chunk_id](ani_data["header"], chunk_data, ani_data)
 
-        ani_cur = AnimatedCursor()
+        frames = tuple(ani_data["list"])
+        # We have to convert the rate to milliseconds. Normally stored in jiffies(1/60ths of a second)
+        delays = (np.asarray(ani_data["rate"], dtype=np.int64) * 1000 // 60).tolist()
 
-        for idx, rate in zip(ani_data["seq"], ani_data["rate"]):
-            # We have to convert the rate to milliseconds. Normally stored in jiffies(1/60ths of a second)
-            ani_cur.append((ani_data["list"][idx], int((rate * 1000) / 60)))
+        ani_cur = AnimatedCursor()
+        ani_cur.extend(
+            (frames[idx], delay) for idx, delay in zip(ani_data["seq"], delays)
+        )
 
         return ani_cur
 
@@ -223,47 +275,65 @@ class AniFormat(AnimatedCursorStorageFormat):
         out.write(b"\0\0\0\0")
         out.write(cls.ACON_MAGIC)
 
-        # Write the header...
-        header = bytearray(36)
-        # We write the header length twice for some dumb reason...
-        header[0:4] = to_bytes(36, 4)  # Header length...
-        header[4:8] = to_bytes(len(cursor), 4)  # Number of frames
-        header[8:12] = to_bytes(len(cursor), 4)  # Number of steps
-        # Ignore width, height, and bits per pixel...
-        # The number of planes should always be 1....
-        header[24:28] = to_bytes(1, 4)
-        header[28:32] = to_bytes(10, 4)  # We just pass 10 as the default delay...
-        header[32:36] = to_bytes(
-            1, 4
-        )  # The flags, last flag is flipped which specifies data is stored in .cur
+        # Write the header... We write the header length twice for some dumb reason...
+        header = _pack_u4(4 + _ANI_HEADER.size) + _ANI_HEADER.pack(
+            len(cursor),  # Number of frames
+            len(cursor),  # Number of steps
+            0,  # Ignore width, height, and bits per pixel...
+            0,
+            0,
+            1,  # The number of planes should always be 1....
+            10,  # We just pass 10 as the default delay...
+            1,  # The flags, last flag is flipped which specifies data is stored in .cur
+        )
 
         write_chunk(out, b"anih", header)
 
-        # Write the LIST of icons...
-        list_data = bytearray(b"fram")
-        delay_data = bytearray()
+        # Write the LIST of icons straight to the file, filling in its size once all of the icons are written... We
+        # write these chunks manually to avoid wasting a ton of lines of code, as using "write_chunks" ends up being
+        # just as complicated...
+        list_start = out.tell()
+        out.write(_CHUNK_HEADER.pack(b"LIST", 0))
+        out.write(b"fram")
+
+        # Frames which reuse the same cursor object (as loaded .ani sequences do) are only encoded once, only those
+        # frames need to be kept around...
+        uses = Counter(id(sub_cursor) for sub_cursor, delay in cursor)
+        encoded = {}
+        mem_stream = BytesIO()
 
         for sub_cursor, delay in cursor:
-            # Writing a single cursor to the list...
-            mem_stream = BytesIO()
-            CurFormat.write(sub_cursor, mem_stream)
-            # We write these chunks manually to avoid wasting a ton of lines of code, as using "write_chunks" ends up
-            # being just as complicated...
-            cur_data = mem_stream.getvalue()
-            list_data.extend(b"icon")
-            list_data.extend(to_bytes(len(cur_data), 4))
-            list_data.extend(cur_data)
-            # Writing the delay to the rate chunk
-            delay_data.extend(to_bytes(round((delay * 60) / 1000), 4))
-
-        # Now that we have gathered the data actually write the chunks...
-        write_chunk(out, b"LIST", list_data)
-        write_chunk(out, b"rate", delay_data)
+            cur_data = encoded.get(id(sub_cursor))
+
+            if cur_data is None:
+                # Writing a single cursor to the list, reusing the same scratch buffer for every frame...
+                mem_stream.seek(0)
+                mem_stream.truncate()
+                CurFormat.write(sub_cursor, mem_stream)
+                cur_data = mem_stream.getvalue()
+
+                if uses[id(sub_cursor)] > 1:
+                    encoded[id(sub_cursor)] = cur_data
+
+            out.write(_CHUNK_HEADER.pack(b"icon", len(cur_data)))
+            out.write(cur_data)
+
+        list_end = out.tell()
+        out.seek(list_start + 4)
+        out.write(_pack_u4(list_end - list_start - _CHUNK_HEADER.size))
+        out.seek(list_end)
+
+        # Convert all of the delays for the rate chunk to jiffies(1/60ths of a second) at once, np.rint rounds halves to
+        # even just like python's round...
+        delays = np.fromiter(
+            (delay for sub_cursor, delay in cursor), dtype=np.float64, count=len(cursor)
+        )
+        write_chunk(out, b"rate", np.rint((delays * 60) / 1000).astype("<u4").tobytes())
 
         # Now we are to the end, get the length of the file and write it as the RIFF chunk length...
         entire_file_len = out.tell() - 8
         out.seek(4)
-        out.write(to_bytes(entire_file_len, 4))
+        out.write(_pack_u4(entire_file_len))
 
     @classmethod
     def get_identifier(cls) -> str:
@@ -1,15 +1,20 @@
+import struct
 from io import BytesIO
-from typing import BinaryIO
+from typing import BinaryIO, Tuple
 
 import numpy as np
 from PIL import Image
 from PIL.IcoImagePlugin import IcoFile
 
 from CursorCreate.lib.cursor import Cursor, CursorIcon
-from CursorCreate.lib.format_core import CursorStorageFormat, to_bytes, to_signed_bytes
+from CursorCreate.lib.format_core import CursorStorageFormat
 
 # The default dpi for BMP images written by this encoder...
 DEF_BMP_DPI = (96, 96)
+# The BMP info header, and the directory entry written for each image in a .cur file...
+_BMP_HEADER = struct.Struct("<IiiHHIIiiII")
+_CUR_ENTRY = struct.Struct("<BBxxHHII")
+_pack_u2 = struct.Struct("<H").pack
 
 
 def _write_bmp(img: Image.Image, out_file: BinaryIO):
@@ -18,45 +23,42 @@ def _write_bmp(img: Image.Image, out_file: BinaryIO):
     ppm = tuple(int(dpi_val * 39.3701 + 0.5) for dpi_val in dpi)
 
     # BMP HEADER:
-    out_file.write(to_bytes(40, 4))  # BMP Header size
-    out_file.write(to_signed_bytes(img.size[0], 4))  # Image Width
-    out_file.write(to_signed_bytes(img.size[1] * 2, 4))  # Image Height
-    out_file.write(to_bytes(1, 2))  # Number of planes
-    out_file.write(to_bytes(32, 2))  # The bits per pixel...
     out_file.write(
-        to_bytes(0, 4)
-    )  # The compression method, we set it to raw or no compression...
-    out_file.write(
-        to_bytes(4 * img.size[0] * (img.size[1] * 2), 4)
-    )  # The size of the image data...
-    out_file.write(
-        to_signed_bytes(ppm[0], 4)
-    )  # The resolution of the width in pixels per meter...
-    out_file.write(
-        to_signed_bytes(ppm[1], 4)
-    )  # The resolution of the height in pixels per meter...
-    out_file.write(
-        to_bytes(0, 4)
-    )  # The number of colors in the color table, in this case none...
-    out_file.write(
-        to_bytes(0, 4)
-    )  # Number of important colors in the color table, again none...
-
-    img = img.convert("RGBA")
-    data = np.array(img)
-    # Create the alpha channel...
-    alpha_channel = data[:, :, 3]
-    alpha_channel = np.packbits(alpha_channel == 0, axis=1)[::-1]
-    # Create the main image with transparency...
-    bgrx_data: np.ndarray = data[::-1, :, (2, 1, 0, 3)]
-    # Dump the main image...
-    out_file.write(bgrx_data.tobytes())
-
-    # We now dump the mask and some zeros to finish filling the space...
-    mask_data = alpha_channel.tobytes()
-    leftover_space = (img.size[0] * img.size[1] * 4) - len(mask_data)
+        _BMP_HEADER.pack(
+            _BMP_HEADER.size,  # BMP Header size
+            img.size[0],  # Image Width
+            img.size[1] * 2,  # Image Height
+            1,  # Number of planes
+            32,  # The bits per pixel...
+            0,  # The compression method, we set it to raw or no compression...
+            4 * img.size[0] * (img.size[1] * 2),  # The size of the image data...
+            ppm[0],  # The resolution of the width in pixels per meter...
+            ppm[1],  # The resolution of the height in pixels per meter...
+            0,  # The number of colors in the color table, in this case none...
+            0,  # Number of important colors in the color table, again none...
+        )
+    )
+
+    # Cursor images are almost always RGBA already, and convert would still make a full copy of them...
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    # Create the mask from the alpha channel, flipping it vertically through a view rather than a copy. Only the alpha
+    # band is pulled into numpy, the color data never leaves PIL...
+    alpha_data = np.asarray(img.getchannel("A"))
+    alpha_channel = np.packbits(alpha_data[::-1] == 0, axis=1)
+    # Dump the main image with transparency, letting PIL's raw encoder swap to BGRA and flip the rows bottom-up in a
+    # single pass rather than gathering channels through numpy's fancy indexing...
+    out_file.write(img.tobytes("raw", "BGRA", 0, -1))
+
+    # We now dump the mask and some zeros to finish filling the space, in one write from a zeroed buffer...
+    mask_data = bytearray(img.size[0] * img.size[1] * 4)
+    mask_data[: alpha_channel.size] = alpha_channel.tobytes()
     out_file.write(mask_data)
-    out_file.write(bytes(leftover_space))
+
+
+def _bmp_size(width: int, height: int) -> int:
+    # The header, the BGRA image, and then the mask padded with zeros to the same size as the image...
+    return _BMP_HEADER.size + 8 * width * height
 
 
 class CurFormat(CursorStorageFormat):
@@ -79,6 +81,10 @@ class CurFormat(CursorStorageFormat):
         """
         return first_bytes[:4] == cls.MAGIC or first_bytes[:4] == cls.ICO_MAGIC
 
+    @classmethod
+    def get_magic_prefixes(cls) -> Tuple[bytes, ...]:
+        return (cls.MAGIC, cls.ICO_MAGIC)
+
     @classmethod
     def read(cls, cur_file: BinaryIO) -> Cursor:
         """
@@ -95,15 +101,10 @@ class CurFormat(CursorStorageFormat):
         is_ico = magic_header == cls.ICO_MAGIC
 
         # Dump the file with the ico header to allow to be read by Pillow Ico reader...
-        data = BytesIO()
-        data.write(cls.ICO_MAGIC)
-        data.write(cur_file.read())
-        data.seek(0)
-
-        ico_img = IcoFile(data)
+        ico_img = IcoFile(BytesIO(cls.ICO_MAGIC + cur_file.read()))
         cursor = Cursor()
 
-        for head in ico_img.entry:
+        for idx, head in enumerate(ico_img.entry):
             width = head["width"]
             height = head["height"]
             x_hot = 0 if is_ico else head["planes"]
@@ -115,7 +116,8 @@ class CurFormat(CursorStorageFormat):
             if not (0 <= y_hot < height):
                 y_hot = 0
 
-            image = ico_img.getimage((width, height))
+            # Load the entry directly by index, rather than having Pillow search the directory again by size...
+            image = ico_img.frame(idx)
 
             cursor.add(CursorIcon(image, x_hot, y_hot))
 
@@ -131,16 +133,6 @@ class CurFormat(CursorStorageFormat):
         image.save(byte_io, "png")
         return byte_io.getvalue()
 
-    @classmethod
-    def _to_bmp(cls, image: Image.Image, size) -> bytes:
-        if image.size != size:
-            raise ValueError(
-                "Size of image stored in image and cursor object don't match!!!"
-            )
-        byte_io = BytesIO()
-        _write_bmp(image, byte_io)
-        return byte_io.getvalue()
-
     @classmethod
     def write(cls, cursor: Cursor, out: BinaryIO):
         """
@@ -149,17 +141,23 @@ class CurFormat(CursorStorageFormat):
         :param cursor: The cursor object to save.
         :param out: The file handle to output the cursor to.
         """
+        # Images larger than 256x256 can't be stored in a .cur, so they are left out of the file entirely...
+        sizes = [size for size in sorted(cursor) if size[0] <= 256 and size[1] <= 256]
+
         out.write(cls.MAGIC)
-        out.write(to_bytes(len(cursor), 2))
+        out.write(_pack_u2(len(sizes)))
 
-        offset = out.tell() + len(cursor) * 16
-        imgs = []
+        # The size of each bmp is known ahead of time, so the directory is written first and the images are then
+        # streamed straight to the file without being buffered. Offsets are relative to the start of the .cur data...
+        offset = len(cls.MAGIC) + 2 + len(sizes) * _CUR_ENTRY.size
 
-        for size in sorted(cursor):
+        for size in sizes:
             width, height = size
 
-            if width > 256 or height > 256:
-                continue
+            if cursor[size].image.size != size:
+                raise ValueError(
+                    "Size of image stored in image and cursor object don't match!!!"
+                )
 
             hot_x, hot_y = cursor[size].hotspot
             hot_x, hot_y = (
@@ -167,26 +165,20 @@ class CurFormat(CursorStorageFormat):
                 hot_y if (0 <= hot_y < height) else 0,
             )
 
-            image_data = cls._to_bmp(cursor[size].image, (width, height))
+            image_len = _bmp_size(width, height)
 
             width, height = (
                 width if (width < 256) else 0,
                 height if (height < 256) else 0,
             )
 
-            out.write(to_bytes(width, 1))  # Width, 1 byte.
-            out.write(to_bytes(height, 1))  # Height, 1 byte.
-            out.write(b"\0\0")
-            out.write(to_bytes(hot_x, 2))
-            out.write(to_bytes(hot_y, 2))
-            out.write(to_bytes(len(image_data), 4))
-            out.write(to_bytes(offset, 4))
+            # Width, height, 2 zero bytes (no palette), the hotspot, and where the image lives in the file...
+            out.write(_CUR_ENTRY.pack(width, height, hot_x, hot_y, image_len, offset))
 
-            offset += len(image_data)
-            imgs.append(image_data)
+            offset += image_len
 
-        for image_data in imgs:
-            out.write(image_data)
+        for size in sizes:
+            _write_bmp(cursor[size].image, out)
 
     @classmethod
     def get_identifier(cls) -> str:
@@ -1,12 +1,18 @@
+import hashlib
+import math
 import plistlib
 
 # For building archives dynamically in-place...
 import tarfile
+import time
 import zipfile
 from abc import ABC, abstractmethod
-from io import BytesIO, StringIO
+from collections import defaultdict
+from functools import reduce
+from io import BytesIO
+from itertools import accumulate
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Type, Union
+from typing import Any, Dict, List, Tuple, Type
 
 import numpy as np
 from PIL import Image, ImageDraw
@@ -113,8 +119,12 @@ class ArchivePath:
     For creating archive paths in .zip and .tar file. Provides basic path string manipulations...
     """
 
+    __slots__ = ("_paths_segments", "_path_str")
+
     def __init__(self, *path_seg):
         self._paths_segments = path_seg
+        # Paths are immutable, so the joined string is only ever built once...
+        self._path_str = "/".join(path_seg)
 
     def __truediv__(self, other):
         return self._new_path(*self._paths_segments, other)
@@ -123,13 +133,25 @@ class ArchivePath:
         return self._new_path(*self._paths_segments[:-1])
 
     def __str__(self):
-        return "/".join(self._paths_segments)
+        return self._path_str
 
     @classmethod
     def _new_path(cls, *path_seg):
         return cls(*path_seg)
 
 
+def _group_links_by_target(sym_links: Dict[str, str]) -> Dict[str, Tuple[str, ...]]:
+    """
+    Private method, inverts a symlink name -> target dictionary into a target -> symlink names dictionary.
+    """
+    links_by_target = defaultdict(list)
+
+    for link, link_to in sym_links.items():
+        links_by_target[link_to].append(link)
+
+    return {link_to: tuple(links) for link_to, links in links_by_target.items()}
+
+
 class LinuxThemeBuilder(CursorThemeBuilder):
     """
     The theme builder for the linux platform. Technically works for any platform which uses X-Org or Wayland
@@ -197,21 +219,30 @@ class LinuxThemeBuilder(CursorThemeBuilder):
         "size_all": "fleur",
         "6407b0e94181790501fd1e167b474872": "copy",
     }
+    # The same symlinks, grouped by the cursor they point to...
+    TARGET_TO_LINKS = _group_links_by_target(SYM_LINKS_TO_CUR)
     # The file name which gives the preview in system settings...
     PREVIEW_FILE = "thumbnail.png"
+    # The largest width or height the preview is stored at, and its png compression level (it's tiny, so a fast
+    # level costs almost nothing in size)...
+    PREVIEW_MAX_SIZE = 128
+    PREVIEW_COMPRESS_LEVEL = 1
     # The x-org index theme file name...
     THEME_FILE_NAME = "index.theme"
     # Name of file storing licence...
     LICENCE_FILE_NAME = "LICENSE.txt"
     # Legal export sizes...
     LEGAL_EXPORT_SIZES = {(32, 32), (48, 48), (64, 64), (128, 128)}
+    # Size of the buffer the theme archive is written through, and the gzip compression level used...
+    ARCHIVE_BUFFER_SIZE = 2 * 1024 * 1024
+    COMPRESS_LEVEL = 6
 
     @classmethod
     def _tarinfo(
         cls,
         name: ArchivePath,
         tar_type: bytes,
-        data: Union[StringIO, BytesIO] = None,
+        data: BytesIO = None,
         **other_args,
     ) -> tarfile.TarInfo:
         new_tarinfo = tarfile.TarInfo(str(name))
@@ -223,7 +254,9 @@ class LinuxThemeBuilder(CursorThemeBuilder):
 
         new_tarinfo.type = tar_type
         if data is not None:
-            new_tarinfo.size = len(data.getvalue())
+            # Measure the data through a view of the buffer, getvalue would copy all of it just to get its length...
+            with data.getbuffer() as data_view:
+                new_tarinfo.size = data_view.nbytes
 
         for key, value in other_args.items():
             setattr(new_tarinfo, key, value)
@@ -238,7 +271,13 @@ class LinuxThemeBuilder(CursorThemeBuilder):
         cursor_dict: Dict[str, AnimatedCursor],
         directory: Path,
     ):
-        with tarfile.open(str(directory / (theme_name + ".tar.gz")), "w|gz") as tar:
+        # The tar is written through a regular (not streaming) gzip file on top of a large write buffer, so zlib gets
+        # big chunks to compress instead of tarfile's tiny streaming blocks...
+        with (directory / (theme_name + ".tar.gz")).open(
+            "wb", buffering=cls.ARCHIVE_BUFFER_SIZE
+        ) as raw_out, tarfile.open(
+            fileobj=raw_out, mode="w:gz", compresslevel=cls.COMPRESS_LEVEL
+        ) as tar:
             # Write the theme directory...
             theme_dir = ArchivePath(theme_name)
             tar.addfile(cls._tarinfo(theme_dir, tarfile.DIRTYPE))
@@ -272,12 +311,19 @@ class LinuxThemeBuilder(CursorThemeBuilder):
             cursor_dir = theme_dir / "cursors"
             tar.addfile(cls._tarinfo(cursor_dir, tarfile.DIRTYPE))
 
-            # Write all of the cursors...
+            # Write all of the cursors, encoding each one into the same scratch buffer...
+            cur_out = BytesIO()
+
             for name, cursor in cursor_dict.items():
-                cursor = cursor.copy()
-                cursor.restrict_to_sizes(cls.LEGAL_EXPORT_SIZES)
+                # Only copy and resize the cursor if its frames don't already hold exactly the sizes we export...
+                if any(
+                    set(sub_cur) != cls.LEGAL_EXPORT_SIZES for sub_cur, delay in cursor
+                ):
+                    cursor = cursor.copy()
+                    cursor.restrict_to_sizes(cls.LEGAL_EXPORT_SIZES)
 
-                cur_out = BytesIO()
+                cur_out.seek(0)
+                cur_out.truncate()
                 XCursorFormat.write(cursor, cur_out)
                 cur_out.seek(0)
                 tar.addfile(
@@ -287,8 +333,18 @@ class LinuxThemeBuilder(CursorThemeBuilder):
             # If default is in the cursor dictionary, create a preview file for this theme...
             if "default" in cursor_dict:
                 d_cur = cursor_dict["default"]
+                preview_img = d_cur[0][0][d_cur[0][0].max_size()].image
+                # The preview is only a thumbnail in the system settings, so there is no need for a huge image...
+                if max(preview_img.size) > cls.PREVIEW_MAX_SIZE:
+                    preview_img = preview_img.copy()
+                    preview_img.thumbnail(
+                        (cls.PREVIEW_MAX_SIZE, cls.PREVIEW_MAX_SIZE), Image.LANCZOS
+                    )
+
                 preview_out = BytesIO()
-                d_cur[0][0][d_cur[0][0].max_size()].image.save(preview_out, "png")
+                preview_img.save(
+                    preview_out, "png", compress_level=cls.PREVIEW_COMPRESS_LEVEL
+                )
                 preview_out.seek(0)
                 tar.addfile(
                     cls._tarinfo(
@@ -297,9 +353,9 @@ class LinuxThemeBuilder(CursorThemeBuilder):
                     preview_out,
                 )
 
-            # Create all required symlinks for linux theme to work fully....
-            for link, link_to in cls.SYM_LINKS_TO_CUR.items():
-                if link_to in cursor_dict:
+            # Create all required symlinks for linux theme to work fully, only visiting cursors the theme has....
+            for link_to in sorted(cls.TARGET_TO_LINKS.keys() & cursor_dict.keys()):
+                for link in cls.TARGET_TO_LINKS[link_to]:
                     tar.addfile(
                         cls._tarinfo(
                             cursor_dir / link, tarfile.SYMTYPE, linkname=link_to
@@ -396,6 +452,15 @@ class WindowsThemeBuilder(CursorThemeBuilder):
     # Name of file storing licence...
     LICENCE_FILE_NAME = "LICENSE.txt"
 
+    @classmethod
+    def _zipinfo(cls, name: ArchivePath, compress_type: int) -> zipfile.ZipInfo:
+        new_zipinfo = zipfile.ZipInfo(str(name), time.localtime()[:6])
+        # Cursors are already packed image data which doesn't compress, so only the text files get deflated...
+        new_zipinfo.compress_type = compress_type
+        # Set windows as the os it was created on such that permissions are not copied...
+        new_zipinfo.create_system = 0
+        return new_zipinfo
+
     @classmethod
     def build_theme(
         cls,
@@ -422,6 +487,9 @@ class WindowsThemeBuilder(CursorThemeBuilder):
             reg_list = ",".join(reg_list)
 
             cursor_names = {}
+            # Every cursor is encoded into the same scratch buffer...
+            out_f = BytesIO()
+
             for name, cursor in win_cursors.items():
                 cursor = cursor.copy()
                 cursor.restrict_to_sizes(cls.LEGAL_EXPORT_SIZES)
@@ -429,29 +497,46 @@ class WindowsThemeBuilder(CursorThemeBuilder):
 
                 if len(cursor) == 0:
                     continue
-                elif len(cursor) == 1:
+
+                out_f.seek(0)
+                out_f.truncate()
+
+                if len(cursor) == 1:
                     file_name += ".cur"
-                    out_f = BytesIO()
                     CurFormat.write(cursor[0][0], out_f)
-                    zip_f.writestr(str(theme_dir / file_name), out_f.getvalue())
+                    zip_f.writestr(
+                        cls._zipinfo(theme_dir / file_name, zipfile.ZIP_STORED),
+                        out_f.getvalue(),
+                    )
                 else:
                     file_name += ".ani"
-                    out_f = BytesIO()
                     AniFormat.write(cursor, out_f)
-                    zip_f.writestr(str(theme_dir / file_name), out_f.getvalue())
+                    zip_f.writestr(
+                        cls._zipinfo(theme_dir / file_name, zipfile.ZIP_STORED),
+                        out_f.getvalue(),
+                    )
 
                 cursor_names[reg_name] = file_name
 
-            cursor_list = "\n".join(
-                [f'"{file_name}"' for file_name in cursor_names.values()]
-            )
-            cursor_reg_list = "\n".join(
-                [f'{name} = "{file_name}"' for name, file_name in cursor_names.items()]
-            )
+            # Build the file and registry lines for the inf in a single pass...
+            cursor_lines = []
+            cursor_reg_lines = []
+            for name, file_name in cursor_names.items():
+                cursor_lines.append(f'"{file_name}"')
+                cursor_reg_lines.append(f'{name} = "{file_name}"')
+
+            cursor_list = "\n".join(cursor_lines)
+            cursor_reg_list = "\n".join(cursor_reg_lines)
 
             licence_text = metadata.get("licence")
             if licence_text is not None:
-                zip_f.writestr(str(theme_dir / cls.LICENCE_FILE_NAME), licence_text)
+                zip_f.writestr(
+                    cls._zipinfo(
+                        theme_dir / cls.LICENCE_FILE_NAME, zipfile.ZIP_DEFLATED
+                    ),
+                    licence_text,
+                    compresslevel=9,
+                )
                 licence_info = f"[Scheme.Txt]\n{cls.LICENCE_FILE_NAME}"
             else:
                 licence_info = ""
@@ -468,12 +553,11 @@ class WindowsThemeBuilder(CursorThemeBuilder):
                 cursor_reg_list=cursor_reg_list,
             )
 
-            zip_f.writestr(str(theme_dir / "install.inf"), inf_file)
-
-            # Set windows as the os it was created on such that permissions are not copied...
-            for z_info in zip_f.filelist:
-                z_info: zipfile.ZipInfo = z_info
-                z_info.create_system = 0
+            zip_f.writestr(
+                cls._zipinfo(theme_dir / "install.inf", zipfile.ZIP_DEFLATED),
+                inf_file,
+                compresslevel=9,
+            )
 
     @classmethod
     def get_name(cls):
@@ -484,7 +568,8 @@ class MacOSMousecapeThemeBuilder(CursorThemeBuilder):
     """
     Cursor theme builder for the MacOS platform. MacOS doesn"t natively support themes, so we actually build a .cape
     file for the Mousecape software on Mac, which allows the user to change cursors. A cape file is a mac plist
-    format(xml) containing each cursor as a dictionary. Animated images are stored vertically, in tiles.
+    (written in the binary plist format) containing each cursor as a dictionary. Animated images are stored
+    vertically, in tiles.
     """
 
     # Converts cursor names to correct mac cursors
@@ -529,6 +614,10 @@ class MacOSMousecapeThemeBuilder(CursorThemeBuilder):
     }
 
     CURSOR_EXPORT_SIZES = [(32, 32), (64, 64), (160, 160)]
+    # Size of the buffer the .cape file is written through...
+    CAPE_BUFFER_SIZE = 1024 * 1024
+    # Zlib level for representations, the images are mostly empty space, so higher levels barely shrink them...
+    PNG_COMPRESS_LEVEL = 1
 
     Vec2D = Tuple[int, int]
 
@@ -548,12 +637,39 @@ class MacOSMousecapeThemeBuilder(CursorThemeBuilder):
                     - Vec2D: Size of image
                     - List[PIL.Image]: Image representations, at 1x, 2x, and 5x...
         """
+        final_hotspot = (cls.CURSOR_EXPORT_SIZES[0][0], cls.CURSOR_EXPORT_SIZES[0][1])
+        final_dims = (
+            cls.CURSOR_EXPORT_SIZES[0][0] * 2,
+            cls.CURSOR_EXPORT_SIZES[0][1] * 2,
+        )
+
+        if len(cur) == 1:
+            # Static cursor, no frame timing to work out, just center the single frame on its hotspot...
+            sub_cur, delay = cur[0]
+            sub_cur = sub_cur.copy()
+            sub_cur.restrict_to_sizes(cls.CURSOR_EXPORT_SIZES)
+            new_images = []
+
+            for size in cls.CURSOR_EXPORT_SIZES:
+                img = Image.new("RGBA", (size[0] * 2, size[1] * 2), (0, 0, 0, 0))
+                img.paste(
+                    sub_cur[size].image,
+                    (
+                        size[0] - sub_cur[size].hotspot[0],
+                        size[1] - sub_cur[size].hotspot[1],
+                    ),
+                )
+                new_images.append(img)
+
+            return 1, float(delay) / 1000, final_hotspot, final_dims, new_images
+
         cur = cur.copy()
 
-        delays = np.array([delay for sub_cur, delay in cur])
-        cumulative_delay = np.cumsum(delays)
-        half_avg = int(np.mean(delays) / 4)
-        gcd_of_em = np.gcd.reduce(delays)
+        # Cursors only have a handful of frames, so plain python beats paying numpy's call overhead for these...
+        delays = [delay for sub_cur, delay in cur]
+        cumulative_delay = list(accumulate(delays))
+        half_avg = int((cumulative_delay[-1] / len(delays)) / 4)
+        gcd_of_em = reduce(math.gcd, delays)
 
         unified_delay = max(gcd_of_em, half_avg)
         num_frames = cumulative_delay[-1] // unified_delay
@@ -564,29 +680,20 @@ class MacOSMousecapeThemeBuilder(CursorThemeBuilder):
             for size in cls.CURSOR_EXPORT_SIZES
         ]
 
-        next_ani_frame = 1
-        for current_out_frame in range(num_frames):
-            time_in = current_out_frame * unified_delay
-            while (next_ani_frame < len(cumulative_delay)) and (
-                time_in >= cumulative_delay[next_ani_frame]
-            ):
-                next_ani_frame += 1
+        # Find the frame shown at the start of each output frame, a frame is shown until its cumulative delay is hit...
+        time_ins = np.arange(num_frames) * unified_delay
+        src_frames = np.searchsorted(cumulative_delay, time_ins, side="right").tolist()
 
+        for current_out_frame, src_frame in enumerate(src_frames):
             for i, img in enumerate(new_images):
                 current_size = cls.CURSOR_EXPORT_SIZES[i]
-                current_cur = cur[next_ani_frame - 1][0][current_size]
+                current_cur = cur[src_frame][0][current_size]
                 x_off = current_size[0] - current_cur.hotspot[0]
                 y_off = ((current_size[1] * 2) * current_out_frame) + (
                     current_size[1] - current_cur.hotspot[1]
                 )
                 img.paste(current_cur.image, (x_off, y_off))
 
-        final_hotspot = (cls.CURSOR_EXPORT_SIZES[0][0], cls.CURSOR_EXPORT_SIZES[0][1])
-        final_dims = (
-            cls.CURSOR_EXPORT_SIZES[0][0] * 2,
-            cls.CURSOR_EXPORT_SIZES[0][1] * 2,
-        )
-
         return (
             int(num_frames),
             float(unified_delay) / 1000,
@@ -595,6 +702,25 @@ class MacOSMousecapeThemeBuilder(CursorThemeBuilder):
             new_images,
         )
 
+    @classmethod
+    def _to_png(cls, img: Image.Image, png_cache: Dict[Tuple, bytes]) -> bytes:
+        """
+        Private method, encodes an image as a png, reusing the encoded data of any identical image already stored
+        in the passed cache.
+        """
+        key = (
+            img.mode,
+            img.size,
+            hashlib.blake2b(img.tobytes(), digest_size=16).digest(),
+        )
+
+        if key not in png_cache:
+            b = BytesIO()
+            img.save(b, "png", compress_level=cls.PNG_COMPRESS_LEVEL)
+            png_cache[key] = b.getvalue()
+
+        return png_cache[key]
+
     @classmethod
     def build_theme(
         cls,
@@ -620,6 +746,9 @@ class MacOSMousecapeThemeBuilder(CursorThemeBuilder):
             "Version": 2.0,
         }
 
+        # Cursors made from the same source produce identical images, which are only encoded once...
+        png_cache = {}
+
         for name, cur in cursor_dict.items():
             if name in cls.LINUX_TO_MAC_CUR:
                 mac_names = cls.LINUX_TO_MAC_CUR[name]
@@ -627,9 +756,7 @@ class MacOSMousecapeThemeBuilder(CursorThemeBuilder):
                 representations = []
 
                 for img in images:
-                    b = BytesIO()
-                    img.save(b, "png")
-                    representations.append(b.getvalue())
+                    representations.append(cls._to_png(img, png_cache))
 
                 for mac_name in mac_names:
                     plist_data["Cursors"][mac_name] = {
@@ -648,8 +775,11 @@ class MacOSMousecapeThemeBuilder(CursorThemeBuilder):
             with (directory / "LICENSE.txt").open("w") as l:
                 l.write(licence)
 
-        with (directory / (theme_name + ".cape")).open("wb") as cape:
-            plistlib.dump(plist_data, cape, fmt=plistlib.FMT_XML, sort_keys=True)
+        # A binary plist stores the png data as is, rather than base64 encoding it into xml text...
+        with (directory / (theme_name + ".cape")).open(
+            "wb", buffering=cls.CAPE_BUFFER_SIZE
+        ) as cape:
+            plistlib.dump(plist_data, cape, fmt=plistlib.FMT_BINARY, sort_keys=True)
 
     @classmethod
     def get_name(cls):
@@ -714,6 +844,38 @@ class PreviewPictureBuilder(CursorThemeBuilder):
         "wayland-cursor",
         "x-cursor",
     ]
+    # Position of each cursor in the order above...
+    CURSOR_ORDER_INDEX = {name: i for i, name in enumerate(CURSOR_ORDER)}
+
+    @classmethod
+    def _make_cross_stamp(cls, cur_center: int) -> Tuple[Image.Image, int]:
+        """
+        Private method, draws the cross marking each cursor's hotspot once, so it can be stamped onto every cell.
+
+        :param cur_center: The offset of the center of a cell, the cross is a quarter of this long in each direction.
+        :return: The cross image and the location of its center on both axes...
+        """
+        cross_len = int(cur_center * 0.25)
+        # Leave a margin for the thickness of the lines...
+        center = cross_len + 2
+        stamp = Image.new("RGBA", (center * 2 + 1, center * 2 + 1), (0, 0, 0, 0))
+        drawer = ImageDraw.Draw(stamp)
+
+        for x_mult, y_mult in zip([0, 0, 1, -1], [1, -1, 0, 0]):
+            x_cross_end = center + x_mult * cross_len
+            y_cross_end = center + y_mult * cross_len
+            drawer.line(
+                (center, center, x_cross_end, y_cross_end),
+                fill=(50, 50, 50, 150),
+                width=3,
+            )
+            drawer.line(
+                (center, center, x_cross_end, y_cross_end),
+                fill=(205, 205, 205, 150),
+                width=1,
+            )
+
+        return stamp, center
 
     @classmethod
     def build_theme(
@@ -730,35 +892,38 @@ class PreviewPictureBuilder(CursorThemeBuilder):
         new_image = Image.new(
             "RGBA", (w_in_curs * cur_w, w_in_curs * cur_w), (0, 0, 0, 0)
         )
-        drawer = ImageDraw.Draw(new_image)
+        cross_stamp, cross_center = cls._make_cross_stamp(cur_center)
+
+        # Place each cursor straight into its slot in the order, cursors not in the order go at the end...
+        ordered = [None] * len(cls.CURSOR_ORDER)
+        extras = []
+        for name in cursor_dict:
+            idx = cls.CURSOR_ORDER_INDEX.get(name)
+            if idx is None:
+                extras.append(name)
+            else:
+                ordered[idx] = name
 
-        cursor_order_dict = {name: i for i, name in enumerate(cls.CURSOR_ORDER)}
+        names = [name for name in ordered if name is not None] + extras
 
-        for i, name in enumerate(sorted(cursor_dict, key=cursor_order_dict.get)):
+        for i, name in enumerate(names):
             lookup_s = (cls.SIZE_PER_CURSOR,) * 2
-            cur = cursor_dict[name].copy()
+            # Only the first frame is shown, so only it needs to be resized...
+            cur = cursor_dict[name][0][0].copy()
             cur.restrict_to_sizes([lookup_s])
 
             x_center = ((i % w_in_curs) * cur_w) + cur_center
             y_center = ((i // w_in_curs) * cur_w) + cur_center
-            x_img_off = x_center - cur[0][0][lookup_s].hotspot[0]
-            y_img_off = y_center - cur[0][0][lookup_s].hotspot[1]
-
-            for x_mult, y_mult in zip([0, 0, 1, -1], [1, -1, 0, 0]):
-                x_cross_end = x_center + int(x_mult * cur_center * 0.25)
-                y_cross_end = y_center + int(y_mult * cur_center * 0.25)
-                drawer.line(
-                    (x_center, y_center, x_cross_end, y_cross_end),
-                    fill=(50, 50, 50, 150),
-                    width=3,
-                )
-                drawer.line(
-                    (x_center, y_center, x_cross_end, y_cross_end),
-                    fill=(205, 205, 205, 150),
-                    width=1,
-                )
+            x_img_off = x_center - cur[lookup_s].hotspot[0]
+            y_img_off = y_center - cur[lookup_s].hotspot[1]
+
+            # Pasted without a mask, exactly like drawing the lines directly, as nothing has been drawn in this cell
+            # yet...
+            new_image.paste(
+                cross_stamp, (x_center - cross_center, y_center - cross_center)
+            )
 
-            cur_img = cur[0][0][lookup_s].image
+            cur_img = cur[lookup_s].image
             new_image.paste(cur_img, (x_img_off, y_img_off), cur_img)
 
         new_image.save(str(directory / f"{theme_name}_preview.png"), "png")
@@ -275,10 +275,16 @@ class AnimatedCursor(list):
     def copy(self) -> "AnimatedCursor":
         """
         Creates a shallow copy of this AnimatedCursor which contains shallow copies of the Cursor objects contained
-        inside of it.
+        inside of it. Frames which share a Cursor object still share a single copy of it in the new AnimatedCursor.
 
         :return: An AnimatedCursor
         """
+        copies = {}
+
+        for cur, delay in self:
+            if id(cur) not in copies:
+                copies[id(cur)] = cur.copy()
+
         return AnimatedCursor(
-            [cur.copy() for cur, delay in self], [delay for cur, delay in self]
+            [copies[id(cur)] for cur, delay in self], [delay for cur, delay in self]
         )
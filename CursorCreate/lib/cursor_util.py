@@ -1,16 +1,29 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import BinaryIO, Tuple
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Tuple, Union
 
 from PIL import Image, ImageOps, ImageSequence
 from CursorCreate.lib import format_core
+
+# Imported so the built in cursor formats are always registered as format_core subclasses before the first load...
+from CursorCreate.lib import ani_format, cur_format, xcur_format  # noqa: F401
 from CursorCreate.lib.cursor import AnimatedCursor, Cursor, CursorIcon
 
 # New SVG Support...
-from CursorCreate.gui.QtKit import QtWidgets, QtWebEngineWidgets, QtWebEngineCore, QtCore
+from CursorCreate.gui.QtKit import (
+    QtWidgets,
+    QtWebEngineWidgets,
+    QtWebEngineCore,
+    QtCore,
+)
+
 # Qt5 Fix...
-if(not hasattr(QtWebEngineCore, "QWebEnginePage")):
+if not hasattr(QtWebEngineCore, "QWebEnginePage"):
     QtWebEngineCore.QWebEnginePage = QtWebEngineWidgets.QWebEnginePage
 import base64
+import json
 
 # Some versions of pillow don't actually have this error, so just set this exception to the general case in this case.
 try:
@@ -22,6 +35,9 @@ except ImportError as e:
 DEFAULT_SIZES = [(32, 32), (48, 48), (64, 64), (128, 128)]
 MAX_DEFAULT_SIZE = DEFAULT_SIZES[-1]
 
+# Pool frames are resized on. Pillow releases the GIL while resampling, so frames are resized in parallel...
+_RESIZE_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
 
 def load_cursor_from_image(file: BinaryIO) -> AnimatedCursor:
     """
@@ -40,57 +56,127 @@ def load_cursor_from_image(file: BinaryIO) -> AnimatedCursor:
     if hasattr(image, "is_animated") and (image.is_animated):
         # If this is an animated file, load in each frame as the frames of the cursor (Ex, ".gif")
         min_dim = min(image.size)  # We fit the image to a square...
-        images_durations = [
-            (ImageOps.fit(image, (min_dim, min_dim)), frame.info.get("duration", 100))
-            for frame in ImageSequence.Iterator(image)
-        ]
+        images, delays = [], []
+
+        # Frames are fit in this thread, as iterating the sequence seeks the shared image...
+        for frame in ImageSequence.Iterator(image):
+            images.append(ImageOps.fit(image, (min_dim, min_dim)))
+            delays.append(frame.info.get("duration", 100))
+
+        return AnimatedCursor(_resize_unique_frames(images, lambda img: img), delays)
     else:
         # Separate all frames (Assumed to be stored horizontally)
         height = image.size[1]
         num_frames = image.size[0] // height
 
+        if (num_frames > 0) and (height > MAX_DEFAULT_SIZE[1]) and (height % 8 == 0):
+            # Allow formats which support it (JPEG) to decode at a reduced scale, as long as every frame is still at
+            # least as big as the largest default size. JPEG scales by 1/2, 1/4, or 1/8, rounding sizes up, so this is
+            # only done when the frame height divides evenly by all of them, keeping frames on whole pixel boundaries...
+            image.draft(
+                image.mode, (num_frames * MAX_DEFAULT_SIZE[0], MAX_DEFAULT_SIZE[1])
+            )
+
         if num_frames == 0:
             raise ValueError(
                 "Image width is smaller then height so this will load as a 0 frame cursor!!!"
             )
 
-        images_durations = [
-            (image.crop((i * height, 0, i * height + height, height)), 100)
-            for i in range(num_frames)
-        ]
+        return AnimatedCursor(
+            _resize_tiled_frames(image, num_frames), [100] * num_frames
+        )
 
-    # Now convert images into the cursors, resizing them to match all the default sizes...
-    final_cursor = AnimatedCursor()
 
-    for img, delay in images_durations:
-        frame = Cursor()
+def _resize_tiled_frames(image: Image.Image, num_frames: int) -> List[Cursor]:
+    """
+    PRIVATE METHOD:
+    Split an image with square frames stored horizontally into its frames, and resize each to the default sizes...
 
-        for size in DEFAULT_SIZES:
-            frame.add(CursorIcon(img.resize(size, Image.LANCZOS), 0, 0))
+    :param image: The image storing the frames.
+    :param num_frames: The number of frames in the image.
+    :return: A list of Cursors, one per frame, with an icon for every size in DEFAULT_SIZES.
+    """
+    # Decode the image before handing it to other threads, pillow loads images lazily...
+    image.load()
+    height = image.size[1]
 
-        final_cursor.append((frame, delay))
+    # Frames are cropped on demand, so only the frames being hashed or resized are held in memory at a time. Resizing
+    # the whole strip in one call isn't done, as the filter would bleed the edges of neighbouring frames together...
+    boxes = [(i * height, 0, i * height + height, height) for i in range(num_frames)]
+    return _resize_unique_frames(boxes, image.crop)
 
-    return final_cursor
 
+def _resize_unique_frames(
+    items: Iterable[Any], get_image: Callable[[Any], Image.Image]
+) -> List[Cursor]:
+    """
+    PRIVATE METHOD:
+    Resize frames to the default sizes on the resize pool, resizing frames with identical pixels (held or repeated
+    animation frames) only once...
 
-class _ChromiumSVGRenderer:
-    SVG_SIZE_SCRIPT = """
-    function get_svg_size() {{
-        let img_text = '{svg_text}';
-        let img = new Image();
+    :param items: The frames, or anything get_image can turn into a frame image.
+    :param get_image: Called to get the image of a frame from an item, might be called more than once per item.
+    :return: A list of Cursors, one per item, with an icon for every size in DEFAULT_SIZES.
+    """
+    keys = []
+    unique = {}
+
+    for item in items:
+        img = get_image(item)
+        digest = hashlib.blake2b(img.tobytes(), digest_size=16)
+        # Palette frames with the same indices can still have different colors...
+        palette = img.getpalette()
+        if palette is not None:
+            digest.update(bytes(palette))
+        key = (img.mode, img.size, img.info.get("transparency"), digest.digest())
+        unique.setdefault(key, item)
+        keys.append(key)
+
+    resized = _RESIZE_POOL.map(
+        lambda item: _resize_to_default_sizes(get_image(item)), unique.values()
+    )
+    resized = dict(zip(unique, resized))
 
-        img.onload = () => console.log([img.naturalWidth, img.naturalHeight]);
-        img.onerror = () => {{
-            throw "Invalid svg image!";
-        }};
-        img.src = 'data:image/svg+xml;base64,' + img_text;
-    }};
+    # Every frame gets its own icons so hotspots can still be set per frame, the (immutable) images are shared...
+    return [
+        Cursor(CursorIcon(resized[key][size].image, 0, 0) for size in resized[key])
+        for key in keys
+    ]
 
-    get_svg_size();
-    """.replace(
-        "\n    ", "\n"
-    )
 
+def _resize_to_default_sizes(img: Image.Image) -> Cursor:
+    """
+    PRIVATE METHOD:
+    Build a static cursor from a square image, containing a copy of the image at each of the default sizes...
+
+    :param img: The square image to resize.
+    :return: A Cursor with an icon for every size in DEFAULT_SIZES, with hotspots of (0, 0).
+    """
+    # Large sources are first shrunk by an integer factor with a cheap box filter (reducing_gap), leaving LANCZOS with
+    # at most 3x the work it would do at the target size, which is visually indistinguishable from a full resample...
+    if img.size == MAX_DEFAULT_SIZE:
+        largest = img
+    else:
+        largest = img.resize(MAX_DEFAULT_SIZE, Image.LANCZOS, reducing_gap=3.0)
+
+    # The smaller sizes are resampled from the largest one when the source is bigger than it, so a large source image
+    # is only ever filtered once. Small sources are still resampled directly, to avoid blurring them twice...
+    source = largest if (img.size[1] > MAX_DEFAULT_SIZE[1]) else img
+
+    icons = []
+
+    for size in DEFAULT_SIZES:
+        if size == MAX_DEFAULT_SIZE:
+            icons.append(CursorIcon(largest, 0, 0))
+        else:
+            icons.append(CursorIcon(source.resize(size, Image.LANCZOS), 0, 0))
+
+    return Cursor(icons)
+
+
+class _ChromiumSVGRenderer:
+    # Loads the svg, and renders it at the requested height keeping its aspect ratio, logging the svg's natural size
+    # alongside the rendered png so both are returned in one trip through the browser...
     SVG_RENDER_SCRIPT = """
     function render_svg() {{
         let img_text = '{svg_text}';
@@ -98,22 +184,21 @@ class _ChromiumSVGRenderer:
 
         img.onload = () => {{
             let c = document.createElement("canvas");
-            c.width = {width};
+            let width = Math.floor({height} * (img.naturalWidth / img.naturalHeight));
+            c.width = width;
             c.height = {height};
             let painter = c.getContext('2d');
-            painter.drawImage(img, 0, 0, {width}, {height});
-            console.log(c.toDataURL().split(',')[1]);
+            painter.drawImage(img, 0, 0, width, {height});
+            console.log(JSON.stringify([img.naturalWidth, img.naturalHeight, c.toDataURL().split(',')[1]]));
         }};
         img.onerror = () => {{
             throw "Invalid svg image!";
         }};
         img.src = 'data:image/svg+xml;base64,' + img_text;
     }};
-    
+
     render_svg();
-    """.replace(
-        "\n    ", "\n"
-    )
+    """.replace("\n    ", "\n")
 
     class DumpPage(QtWebEngineCore.QWebEnginePage):
         JSMessageLevel = QtWebEngineCore.QWebEnginePage.JavaScriptConsoleMessageLevel
@@ -161,69 +246,99 @@ class _ChromiumSVGRenderer:
 
         return str(message[1])
 
-    def get_svg_size(self, file: BinaryIO) -> Tuple[int, int]:
-        res = self._run_script(self.SVG_SIZE_SCRIPT, svg_text=self._load_file_b64(file))
-        w, h = [int(v) for v in res.split(",")]
-        return (w, h)
-
-    def render_svg(self, file: BinaryIO, width: int, height: int) -> BinaryIO:
-        res = self._run_script(
-            self.SVG_RENDER_SCRIPT,
-            svg_text=self._load_file_b64(file),
-            width=width,
-            height=height,
+    def render_svg(self, svg_text: str, height: int) -> Tuple[Tuple[int, int], str]:
+        """
+        Render an svg at the given height, keeping its aspect ratio...
+
+        :param svg_text: The svg file, base64 encoded.
+        :param height: The height to render the svg at.
+        :return: A tuple containing the natural (width, height) of the svg and the rendered png, base64 encoded.
+        """
+        w, h, png_text = json.loads(
+            self._run_script(self.SVG_RENDER_SCRIPT, svg_text=svg_text, height=height)
         )
+        return (int(w), int(h)), png_text
 
-        return BytesIO(base64.b64decode(res.encode()))
 
-    def __del__(self):
-        self._web_engine.destroy()
-        del self._page
-        del self._web_engine
+# The svg renderer, created on first use and kept for the life of the program, as starting up the browser is slow...
+_SVG_RENDERER = None
+
+
+def _get_svg_renderer() -> _ChromiumSVGRenderer:
+    global _SVG_RENDERER
+
+    if _SVG_RENDERER is None:
+        _SVG_RENDERER = _ChromiumSVGRenderer()
+
+    return _SVG_RENDERER
 
 
 def load_cursor_from_svg(file: BinaryIO) -> AnimatedCursor:
     """
     Load a cursor from an SVG. SVG is expected to be square. If it is not square, this method will slide
     horizontally across the SVG using a height * height square, loading each following square as next frame of the
-    cursor with a delay of 100 and hotspots of (0, 0). Note this method uses CairoSVG library to load and render
-    SVGs of various sizes to bitmaps. For info on supported SVG features, look at the docs for the CairoSVG library.
+    cursor with a delay of 100 and hotspots of (0, 0). Note this method uses Qt's WebEngine (Chromium) to load and
+    render SVGs to bitmaps, so any SVG features supported by Chromium are supported here.
 
     :param file: The file handler pointing to the SVG data.
     :return: An AnimatedCursor object, representing an animated cursor. Static cursors will only have 1 frame.
     """
-    # Convert SVG in memory to PNG, and read that in with PIL to get the default size of the SVG...
-    svg_renderer = _ChromiumSVGRenderer()
-    w, h = svg_renderer.get_svg_size(file)
+    # Rasterize the svg once at the largest default size, the smaller sizes are resampled from that render, as a trip
+    # through the browser costs far more than a resize. The svg's size comes back with the render...
+    svg_text = _ChromiumSVGRenderer._load_file_b64(file)
+    (w, h), png_text = _get_svg_renderer().render_svg(svg_text, MAX_DEFAULT_SIZE[1])
 
     # Compute height to width ratio an the number of frame(Assumes they are stored horizontally)...
-    h_to_w_multiplier = w / h
-    num_frames = int(h_to_w_multiplier)
+    num_frames = int(w / h)
 
     if num_frames == 0:
         raise ValueError(
             "Image width is smaller then height so this will load as a 0 frame cursor!!!"
         )
 
-    # Build empty animated cursor to start stashing frames in...
-    ani_cur = AnimatedCursor([Cursor() for __ in range(num_frames)], [100] * num_frames)
+    image = Image.open(BytesIO(base64.b64decode(png_text)))
+
+    return AnimatedCursor(_resize_tiled_frames(image, num_frames), [100] * num_frames)
+
+
+# Table of magic prefix -> (reader, is animated) pairs for all loaded cursor formats, and the distinct prefix lengths
+# to look up, built on first use. Readers which provide no prefixes are stored under None and are always checked...
+_MAGIC_DISPATCH = None
 
-    for sizes in DEFAULT_SIZES:
-        # For each default size, resize svg to it and add all frames to the AnimatedCursor object...
-        image = svg_renderer.render_svg(
-            file, int(sizes[1] * h_to_w_multiplier), sizes[1]
+
+def _get_magic_dispatch() -> (
+    Tuple[Dict[Union[bytes, None], List[Tuple[Any, bool]]], Tuple[int, ...]]
+):
+    global _MAGIC_DISPATCH
+
+    if _MAGIC_DISPATCH is None:
+        table = {}
+        readers = [
+            (reader, True)
+            for reader in format_core.AnimatedCursorStorageFormat.__subclasses__()
+        ]
+        readers.extend(
+            (reader, False)
+            for reader in format_core.CursorStorageFormat.__subclasses__()
         )
-        image = Image.open(image)
 
-        height = image.size[1]
-        for i in range(num_frames):
-            ani_cur[i][0].add(
-                CursorIcon(
-                    image.crop((i * height, 0, i * height + height, height)), 0, 0
-                )
-            )
+        for reader, is_animated in readers:
+            for prefix in reader.get_magic_prefixes() or (None,):
+                table.setdefault(prefix, []).append((reader, is_animated))
+
+        lengths = tuple(sorted({len(prefix) for prefix in table if prefix is not None}))
+        _MAGIC_DISPATCH = (table, lengths)
 
-    return ani_cur
+    return _MAGIC_DISPATCH
+
+
+def refresh_formats():
+    """
+    Rebuild the table of cursor formats on the next load. The formats are only looked up once, so this must be
+    called if a new cursor format is defined after a cursor has already been loaded...
+    """
+    global _MAGIC_DISPATCH
+    _MAGIC_DISPATCH = None
 
 
 def load_cursor_from_cursor(file: BinaryIO) -> AnimatedCursor:
@@ -234,24 +349,26 @@ def load_cursor_from_cursor(file: BinaryIO) -> AnimatedCursor:
     :param file: The file handler pointing to the SVG data.
     :return: An AnimatedCursor object, representing an animated cursor. Static cursors will only have 1 frame.
     """
-    # Currently supported cursor formats...
-    ani_cur_readers = format_core.AnimatedCursorStorageFormat.__subclasses__()
-    cur_readers = format_core.CursorStorageFormat.__subclasses__()
+    table, lengths = _get_magic_dispatch()
 
     file.seek(0)
     magic = file.read(12)
     file.seek(0)
 
-    for reader in ani_cur_readers:
-        if reader.check(magic):
-            ani_cur = reader.read(file)
-            ani_cur.normalize(DEFAULT_SIZES)
-            ani_cur.remove_non_square_sizes()
-            return ani_cur
+    # Only readers whose prefix matches the file get checked, animated formats are still tried first...
+    candidates = [
+        reader for length in lengths for reader in table.get(magic[:length], ())
+    ]
+    candidates.extend(table.get(None, ()))
+    candidates.sort(key=lambda entry: not entry[1])
 
-    for reader in cur_readers:
+    for reader, is_animated in candidates:
         if reader.check(magic):
-            ani_cur = AnimatedCursor([reader.read(file)], [100])
+            ani_cur = (
+                reader.read(file)
+                if is_animated
+                else AnimatedCursor([reader.read(file)], [100])
+            )
             ani_cur.normalize(DEFAULT_SIZES)
             ani_cur.remove_non_square_sizes()
             return ani_cur
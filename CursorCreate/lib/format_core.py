@@ -1,8 +1,22 @@
+import struct
 from abc import ABC, abstractmethod
-from typing import BinaryIO
+from typing import BinaryIO, Tuple
 
 from CursorCreate.lib.cursor import AnimatedCursor, Cursor
 
+# Precompiled structs for unsigned integers of the common widths, by (length in bytes, byteorder)...
+_UINT_STRUCTS = {
+    (length, byteorder): struct.Struct(prefix + code)
+    for length, code in ((1, "B"), (2, "H"), (4, "I"), (8, "Q"))
+    for byteorder, prefix in (("little", "<"), ("big", ">"))
+}
+# Same as above, for signed integers...
+_INT_STRUCTS = {
+    (length, byteorder): struct.Struct(prefix + code)
+    for length, code in ((1, "b"), (2, "h"), (4, "i"), (8, "q"))
+    for byteorder, prefix in (("little", "<"), ("big", ">"))
+}
+
 
 def to_bytes(num: int, length: int, byteorder: str = "little") -> bytes:
     """
@@ -13,6 +27,14 @@ def to_bytes(num: int, length: int, byteorder: str = "little") -> bytes:
     :param byteorder: The byteorder. Valid options are "little" and "big"...
     :return: A bytes object encoding the unsigned integer of length bits...
     """
+    packer = _UINT_STRUCTS.get((length, byteorder))
+
+    if packer is not None:
+        try:
+            return packer.pack(num)
+        except struct.error:
+            pass  # Out of range or not an integer, let int.to_bytes raise its usual error...
+
     return int.to_bytes(num, length, byteorder)
 
 
@@ -24,6 +46,11 @@ def to_int(b: bytes, byteorder: str = "little") -> int:
     :param byteorder: The byteorder. Valid options are "little" and "big"...
     :return: An integer, represented by the bytes...
     """
+    unpacker = _UINT_STRUCTS.get((len(b), byteorder))
+
+    if unpacker is not None:
+        return unpacker.unpack(b)[0]
+
     return int.from_bytes(b, byteorder)
 
 
@@ -35,15 +62,14 @@ def to_signed_int(b, byteorder="little"):
     :param byteorder: The byteorder. Valid options are "little" and "big"...
     :return: A signed integer, represented by the bytes...
     """
-    new_int = to_int(b, byteorder)
-    power = 2 ** (len(b) * 8)
-    signed_limit = (power // 2) - 1
-    print(new_int, power, signed_limit)
+    unpacker = _INT_STRUCTS.get((len(b), byteorder))
 
-    if new_int > signed_limit:
-        new_int = -(power - new_int)
+    if unpacker is not None:
+        return unpacker.unpack(b)[0]
 
-    return new_int
+    # Sign extend other widths by flipping the sign bit and subtracting it back off (two's complement)...
+    sign_bit = 1 << (len(b) * 8 - 1)
+    return (int.from_bytes(b, byteorder) ^ sign_bit) - sign_bit
 
 
 def to_signed_bytes(num, length, byteorder="little"):
@@ -85,6 +111,16 @@ class CursorStorageFormat(ABC):
         """
         raise NotImplementedError(cls.__ERROR_MSG)
 
+    @classmethod
+    def get_magic_prefixes(cls) -> Tuple[bytes, ...]:
+        """
+        Get the fixed bytes files of this format can start with, used to narrow down which formats to check when
+        loading a file. The default returns no prefixes, meaning check will be called for every file...
+
+        :return: A tuple of bytes objects, the possible starting magic bytes of this format.
+        """
+        return ()
+
     @classmethod
     @abstractmethod
     def read(cls, cur_file: BinaryIO) -> AnimatedCursor:
@@ -133,6 +169,16 @@ class AnimatedCursorStorageFormat(ABC):
         """
         raise NotImplementedError(cls.__ERROR_MSG)
 
+    @classmethod
+    def get_magic_prefixes(cls) -> Tuple[bytes, ...]:
+        """
+        Get the fixed bytes files of this format can start with, used to narrow down which formats to check when
+        loading a file. The default returns no prefixes, meaning check will be called for every file...
+
+        :return: A tuple of bytes objects, the possible starting magic bytes of this format.
+        """
+        return ()
+
     @classmethod
     @abstractmethod
     def read(cls, cur_file: BinaryIO) -> AnimatedCursor:
@@ -34,6 +34,10 @@ class XCursorFormat(AnimatedCursorStorageFormat):
         """
         return first_bytes[:4] == cls.MAGIC
 
+    @classmethod
+    def get_magic_prefixes(cls) -> Tuple[bytes, ...]:
+        return (cls.MAGIC,)
+
     @classmethod
     def _assert(cls, boolean, msg="Something is wrong!!!"):
         """Private, used for throwing exceptions when assertions don't hold while reading the format."""
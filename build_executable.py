@@ -8,15 +8,15 @@ script_folder = Path(__file__).resolve().parent
 env = os.environ.copy()
 # Import QtKit to figure out what Qt library is being used...
 import CursorCreate.gui.QtKit as QtKit
-env["PYTHON_QT_LIB"] = QtKit.__name__
+env["PYTHON_QT_LIB"] = QtKit.QtCore.__name__.split(".")[0]
 
 if(sys.platform.startswith("win")):
-    command = "python -m nuitka --standalone --onefile --windows-disable-console --windows-icon-from-ico=icon_windows.ico --enable-plugin=pyside6 --enable-plugin=numpy CursorCreate/cursorcreate.py"
+    command = "python -m nuitka --standalone --onefile --windows-disable-console --windows-icon-from-ico=icon_windows.ico --enable-plugin=pyside6 --enable-plugin=numpy --include-data-files=CursorCreate/gui/icon.png=CursorCreate/gui/icon.png CursorCreate/cursorcreate.py"
 elif(sys.platform.startswith("linux")):
-    command = "python -m nuitka --standalone --onefile --linux-onefile-icon=icon_linux.xpm --enable-plugin=pyside6 --enable-plugin=numpy CursorCreate/cursorcreate.py"
+    command = "python -m nuitka --standalone --onefile --linux-onefile-icon=icon_linux.xpm --enable-plugin=pyside6 --enable-plugin=numpy --include-data-files=CursorCreate/gui/icon.png=CursorCreate/gui/icon.png CursorCreate/cursorcreate.py"
 elif(sys.platform.startswith("darwin")):
     # Would be nice to use nuitka at some point...
-    # command = "python -m nuitka --standalone --onefile --macos-create-app-bundle --macos-disable-console --macos-onefile-icon=icon_mac.icns --enable-plugin=pyside6 --enable-plugin=numpy CursorCreate/cursorcreate.py"
+    # command = "python -m nuitka --standalone --onefile --macos-create-app-bundle --macos-disable-console --macos-onefile-icon=icon_mac.icns --enable-plugin=pyside6 --enable-plugin=numpy --include-data-files=CursorCreate/gui/icon.png=CursorCreate/gui/icon.png CursorCreate/cursorcreate.py"
     command = "pyinstaller CursorCreate.spec"
 else:
     raise EnvironmentError(f"Unsupported Platform: {sys.platform}")
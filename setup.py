@@ -9,6 +9,7 @@ setup(
     name="CursorCreate",
     version="1.4.0",
     packages=["CursorCreate", "CursorCreate.gui", "CursorCreate.lib"],
+    package_data={"CursorCreate.gui": ["icon.png"]},
     url="https://github.com/isaacrobinson2000/CursorCreate",
     license="GPLv3",
     author="Isaac Robinson",
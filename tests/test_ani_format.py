@@ -0,0 +1,114 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from CursorCreate.lib.ani_format import AniFormat, read_chunks, write_chunk
+from CursorCreate.lib.cursor import AnimatedCursor, Cursor, CursorIcon
+
+
+def _make_cursor(seed: int) -> Cursor:
+    data = np.random.default_rng(seed).integers(0, 256, (32, 32, 4), dtype=np.uint8)
+    data[..., 3] = np.where(data[..., 3] < 128, 0, 255)
+    return Cursor([CursorIcon(Image.fromarray(data, "RGBA"), 1, 2)])
+
+
+def test_write_chunks():
+    frames = [_make_cursor(0), _make_cursor(1)]
+    # The first frame is used twice, to cover frames which are shared between steps...
+    cursor = AnimatedCursor([frames[0], frames[1], frames[0]], [100, 50, 1000])
+    out = BytesIO()
+    AniFormat.write(cursor, out)
+    data = out.getvalue()
+
+    assert AniFormat.check(data[:12])
+    assert int.from_bytes(data[4:8], "little") == len(data) - 8
+
+    buffer = BytesIO(data[12:])
+    chunks = list(read_chunks(buffer, skip_chunks={b"fram"}, list_chunks={b"LIST"}))
+    assert buffer.read() == b""
+
+    chunk_ids = [chunk_id for chunk_id, size, chunk_data in chunks]
+    assert chunk_ids == [b"anih", b"icon", b"icon", b"icon", b"rate"]
+
+    header = chunks[0][2]
+    assert int.from_bytes(header[:4], "little") == 36
+    # Frames and steps...
+    assert int.from_bytes(header[4:8], "little") == 3
+    assert int.from_bytes(header[8:12], "little") == 3
+
+    icons = [chunk_data for chunk_id, size, chunk_data in chunks if chunk_id == b"icon"]
+    assert icons[0] == icons[2]
+
+    for icon, (frame, delay) in zip(icons, cursor):
+        with Image.open(BytesIO(icon)) as img:
+            written = np.asarray(img.convert("RGBA"))
+        expected = np.asarray(frame[(32, 32)].image)
+        visible = expected[..., 3] != 0
+        assert np.array_equal(written[visible], expected[visible])
+
+    rate = chunks[-1][2]
+    # Delays are stored in jiffies (1/60ths of a second)...
+    assert [int.from_bytes(rate[i : i + 4], "little") for i in range(0, 12, 4)] == [
+        6,
+        3,
+        60,
+    ]
+
+
+def test_shared_frames_stay_shared_in_copies():
+    frame = _make_cursor(0)
+    cursor = AnimatedCursor([frame, _make_cursor(1), frame], [100, 100, 100])
+    copy = cursor.copy()
+
+    assert copy[0][0] is copy[2][0]
+    assert copy[0][0] is not frame
+
+    out = BytesIO()
+    AniFormat.write(copy, out)
+    expected = BytesIO()
+    AniFormat.write(cursor, expected)
+    assert out.getvalue() == expected.getvalue()
+
+
+def _make_ani(*chunks) -> BytesIO:
+    body = BytesIO()
+    for chunk_id, chunk_data in chunks:
+        write_chunk(body, chunk_id, chunk_data)
+    data = body.getvalue()
+
+    return BytesIO(
+        AniFormat.RIFF_MAGIC
+        + (len(data) + 4).to_bytes(4, "little")
+        + AniFormat.ACON_MAGIC
+        + data
+    )
+
+
+def _make_header(num_frames: int, num_steps: int, flags: int = 1) -> bytes:
+    fields = [36, num_frames, num_steps, 0, 0, 0, 0, 10, flags]
+    return b"".join(field.to_bytes(4, "little") for field in fields)
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        # Truncated header...
+        [(b"anih", _make_header(1, 1)[:20])],
+        [(b"anih", b"")],
+        # Steps but no frames to play...
+        [(b"anih", _make_header(0, 3))],
+        # Two headers...
+        [(b"anih", _make_header(1, 1)), (b"anih", _make_header(1, 1))],
+        # Sequence chunks which don't match the step count, or come before the header...
+        [(b"anih", _make_header(2, 3, 3)), (b"seq ", bytes(8))],
+        [(b"anih", _make_header(2, 3, 3)), (b"seq ", bytes(13))],
+        [(b"seq ", bytes(12)), (b"anih", _make_header(2, 3, 3))],
+        # Rate chunks which don't match the step count...
+        [(b"anih", _make_header(2, 3)), (b"rate", bytes(4))],
+    ],
+)
+def test_read_malformed(chunks):
+    with pytest.raises(SyntaxError):
+        AniFormat.read(_make_ani(*chunks))
@@ -0,0 +1,68 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from CursorCreate.lib.cur_format import CurFormat
+from CursorCreate.lib.cursor import Cursor, CursorIcon
+
+
+def _make_image(size: int, seed: int = 0) -> Image.Image:
+    # Random colors, with fully transparent pixels scattered in so the mask isn't trivial...
+    data = np.random.default_rng(seed).integers(0, 256, (size, size, 4), dtype=np.uint8)
+    data[..., 3] = np.where(data[..., 3] < 128, 0, 255)
+    return Image.fromarray(data, "RGBA")
+
+
+def test_write_is_readable_by_pillow():
+    cursor = Cursor(
+        CursorIcon(_make_image(size, size), size // 4, size // 2) for size in (32, 64)
+    )
+    out = BytesIO()
+    CurFormat.write(cursor, out)
+
+    data = out.getvalue()
+    assert data[:4] == CurFormat.MAGIC
+    assert int.from_bytes(data[4:6], "little") == 2
+
+    with Image.open(BytesIO(data)) as img:
+        assert img.format == "CUR"
+        assert img.size == (64, 64)
+        written = np.asarray(img.convert("RGBA"))
+
+    # Pillow's cur reader ignores the transparency of 32 bit images, so only the colors are compared...
+    expected = np.asarray(cursor[(64, 64)].image)
+    assert np.array_equal(written[..., :3], expected[..., :3])
+
+
+def test_write_directory_entries():
+    cursor = Cursor(
+        [CursorIcon(_make_image(32), 5, 7), CursorIcon(_make_image(64, 1), 60, 3)]
+    )
+    out = BytesIO()
+    CurFormat.write(cursor, out)
+    data = out.getvalue()
+
+    offset = 6
+    for size, hotspot in (((32, 32), (5, 7)), ((64, 64), (60, 3))):
+        entry = data[offset : offset + 16]
+        assert (entry[0], entry[1]) == size
+        assert (
+            int.from_bytes(entry[4:6], "little"),
+            int.from_bytes(entry[6:8], "little"),
+        ) == hotspot
+
+        img_size = int.from_bytes(entry[8:12], "little")
+        img_offset = int.from_bytes(entry[12:16], "little")
+        # BMP info header + BGRA pixels + a mask padded out to the size of the pixel data...
+        assert img_size == 40 + 8 * size[0] * size[1]
+        assert int.from_bytes(data[img_offset : img_offset + 4], "little") == 40
+
+        # The AND mask follows the pixel data, bottom-up, with set bits for fully transparent pixels...
+        mask_offset = img_offset + 40 + 4 * size[0] * size[1]
+        alpha = np.asarray(cursor[size].image.getchannel("A"))
+        expected_mask = np.packbits(alpha[::-1] == 0, axis=1).tobytes()
+        assert data[mask_offset : mask_offset + len(expected_mask)] == expected_mask
+        offset += 16
+
+    assert img_offset + img_size == len(data)
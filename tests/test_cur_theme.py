@@ -0,0 +1,54 @@
+import plistlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from CursorCreate.lib.cur_theme import MacOSMousecapeThemeBuilder
+from CursorCreate.lib.cursor import AnimatedCursor, Cursor, CursorIcon
+
+# A distinct solid color per source frame, so each output tile shows which frame it came from...
+_COLORS = [(255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 255)]
+
+
+def _make_frame(color) -> Cursor:
+    return Cursor(
+        CursorIcon(Image.new("RGBA", size, color), 0, 0)
+        for size in MacOSMousecapeThemeBuilder.CURSOR_EXPORT_SIZES
+    )
+
+
+@pytest.mark.parametrize(
+    "delays, frame_duration, expected_order",
+    [
+        # Cumulative delays of 100, 400, 600, played in steps of the gcd (100ms)...
+        ([100, 300, 200], 0.1, [0, 1, 1, 1, 2, 2]),
+        # Cumulative delays of 30, 100, 200, played in steps of a quarter of the average delay (16ms)...
+        ([30, 70, 100], 0.016, [0, 0, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2]),
+    ],
+)
+def test_cape_frame_order(tmp_path, delays, frame_duration, expected_order):
+    cursor = AnimatedCursor([_make_frame(color) for color in _COLORS], delays)
+    MacOSMousecapeThemeBuilder.build_theme(
+        "Test", {"author": None, "licence": None}, {"wait": cursor}, tmp_path
+    )
+
+    with (tmp_path / "Test.cape").open("rb") as f:
+        cape = plistlib.load(f)
+
+    entry = cape["Cursors"]["com.apple.coregraphics.Wait"]
+    assert entry["FrameCount"] == len(expected_order)
+    assert entry["FrameDuration"] == pytest.approx(frame_duration)
+
+    for (w, h), png in zip(
+        MacOSMousecapeThemeBuilder.CURSOR_EXPORT_SIZES, entry["Representations"]
+    ):
+        with Image.open(BytesIO(png)) as img:
+            img = img.convert("RGBA")
+            assert img.size == (w * 2, h * 2 * len(expected_order))
+            # Each tile is twice the cursor's size, with the hotspot (0, 0) placed at the tile's center...
+            order = [
+                _COLORS.index(img.getpixel((w + w // 2, (h * 2 * i) + h + h // 2)))
+                for i in range(len(expected_order))
+            ]
+        assert order == expected_order
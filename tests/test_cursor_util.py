@@ -0,0 +1,119 @@
+import gc
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# cursor_util pulls in Qt's web engine for svg rendering, so these are skipped where it can't be loaded...
+cursor_util = pytest.importorskip("CursorCreate.lib.cursor_util", exc_type=ImportError)
+
+
+def _make_palette_image(color) -> Image.Image:
+    img = Image.new("P", (16, 16), 1)
+    img.putpalette([0, 0, 0] + list(color))
+    return img
+
+
+def test_palette_frames_with_different_colors_are_not_merged():
+    red, blue = _make_palette_image((255, 0, 0)), _make_palette_image((0, 0, 255))
+    # Same indices, only the palettes differ...
+    assert red.tobytes() == blue.tobytes()
+
+    cursors = cursor_util._resize_unique_frames([red, blue], lambda img: img)
+
+    assert len(cursors) == 2
+    for cursor, color in zip(cursors, ((255, 0, 0), (0, 0, 255))):
+        for size in cursor_util.DEFAULT_SIZES:
+            assert cursor[size].image.convert("RGB").getpixel((0, 0)) == color
+
+    assert cursors[0][(32, 32)].image is not cursors[1][(32, 32)].image
+
+
+@pytest.mark.parametrize("num_frames, height", [(10, 301), (4, 256)])
+def test_jpeg_strip_keeps_every_frame(num_frames, height):
+    # Frame heights that aren't a multiple of 8 can't be drafted without frames drifting off their boundaries...
+    colors = np.linspace(0, 255, num_frames).astype(np.uint8)
+    strip = (
+        np.repeat(colors, height)[None, :, None]
+        .repeat(height, axis=0)
+        .repeat(3, axis=2)
+    )
+    data = BytesIO()
+    Image.fromarray(strip, "RGB").save(data, "JPEG", quality=95)
+    data.seek(0)
+
+    cursor = cursor_util.load_cursor_from_image(data)
+
+    assert len(cursor) == num_frames
+    for (frame, delay), color in zip(cursor, colors):
+        assert delay == 100
+        pixels = np.asarray(frame[(128, 128)].image.convert("L"), dtype=int)
+        # Checking the edge columns catches crop boxes which have drifted into a neighbouring frame...
+        for column in (0, 64, 127):
+            assert abs(pixels[:, column].mean() - int(color)) <= 8
+
+
+def test_format_defined_after_import_is_found_after_refresh():
+    from CursorCreate.lib.cursor import Cursor, CursorIcon
+    from CursorCreate.lib.format_core import CursorStorageFormat
+
+    magic = b"TSTCUR\x00\x00"
+    data = BytesIO(magic + bytes(8))
+    # Build the format table before the new format exists...
+    with pytest.raises(ValueError):
+        cursor_util.load_cursor_from_cursor(data)
+
+    class _TestFormat(CursorStorageFormat):
+        @classmethod
+        def check(cls, first_bytes):
+            return first_bytes[: len(magic)] == magic
+
+        @classmethod
+        def get_magic_prefixes(cls):
+            return (magic,)
+
+        @classmethod
+        def read(cls, cur_file):
+            return Cursor([CursorIcon(Image.new("RGBA", (32, 32)), 3, 4)])
+
+        @classmethod
+        def write(cls, cursor, out):
+            raise NotImplementedError()
+
+        @classmethod
+        def get_identifier(cls):
+            return "tst"
+
+    try:
+        # The format table is cached, so the new format isn't seen until it is refreshed...
+        with pytest.raises(ValueError):
+            cursor_util.load_cursor_from_cursor(data)
+
+        cursor_util.refresh_formats()
+        cursor = cursor_util.load_cursor_from_cursor(data)
+
+        assert len(cursor) == 1
+        assert cursor[0][0][(32, 32)].hotspot == (3, 4)
+    finally:
+        # Drop the test format so it doesn't linger in the subclass list for other tests...
+        del _TestFormat
+        gc.collect()
+        cursor_util.refresh_formats()
+
+
+@pytest.mark.parametrize("image_format", ["PNG", "WEBP"])
+def test_non_cursor_files_fall_through_to_pil(image_format):
+    # WebP files are RIFF files too, so they share a prefix with .ani but must fail its check...
+    data = BytesIO()
+    Image.new("RGBA", (64, 32), (255, 0, 0, 255)).save(data, image_format)
+    data.seek(0)
+
+    with pytest.raises(ValueError):
+        cursor_util.load_cursor_from_cursor(data)
+
+    data.seek(0)
+    cursor = cursor_util.load_cursor(data)
+
+    assert len(cursor) == 2
+    assert set(cursor[0][0]) == set(cursor_util.DEFAULT_SIZES)